@@ -1,23 +1,33 @@
 
 # document_comparator.py - Module for comparing two documents using LLMs
 # Usage:
-#   from document_comparator import DocumentComparator
-#   comparator = DocumentComparator()
+#   from document_comparator import get_comparator
+#   comparator = get_comparator()  # shared per warm container
 #   result = comparator.compare_documents(input_data)
+import os
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from typing import List
+from pydantic import BaseModel
 from prompt.prompt_library import PROMPT_MODEL_REGISTRY
 from models.models import DocumentComparisonInput, DocumentComparisonResult
 from utils.utils import CustomLogger
 from langchain_core.output_parsers import JsonOutputParser
 from langchain.output_parsers import OutputFixingParser
+from langchain_core.runnables import RunnableLambda
+from langchain.text_splitter import RecursiveCharacterTextSplitter
 from utils.model_loader import ModelLoader
-from ..utils.utils import CustomLogger
-from langchain_core.output_parsers import JsonOutputParser
-from langchain.output_parsers import OutputFixingParser
-from prompt.prompt_library import PROMPT_MODEL_REGISTRY
-from utils.model_loader import ModelLoader
-logger = CustomLogger(__name__)
-
 logger = CustomLogger(__name__)
+# Recent comparison results kept per comparator, keyed by the two documents' SHA-256 digests
+COMPARISON_CACHE_SIZE = int(os.getenv("COMPARISON_CACHE_SIZE", "128"))
+# Documents longer than this are compared chunk-by-chunk (map) and the partial results merged (reduce)
+LONG_DOCUMENT_CHARS = int(os.getenv("COMPARATOR_LONG_DOCUMENT_CHARS", "12000"))
+COMPARATOR_CHUNK_SIZE = 4000
+COMPARATOR_CHUNK_OVERLAP = 200
+# Text fields of the comparison result that are merged across chunk pairs
+_MERGED_FIELDS = ("similarities", "differences", "unique_to_doc1", "unique_to_doc2")
 class DocumentComparator:
     """
     Compares two documents using a pre-defined LLM prompt and output model.
@@ -34,10 +44,41 @@ class DocumentComparator:
             self.output_model = prompt_config["output_model"]
             self.parser = JsonOutputParser(pydantic_object=self.output_model)
             self.fixing_parser = OutputFixingParser.from_llm(parser=self.parser, llm=self.llm)
+            # built once, reused per call; the last step validates the raw LLM text in one pass
+            self._chain = self.prompt | self.llm | RunnableLambda(self._parse_llm_output)
+            self._format_instructions = self.parser.get_format_instructions()  # schema → str once
+            self._recent_results: "OrderedDict[tuple, dict]" = OrderedDict()
+            self._recent_lock = threading.Lock()
+            self._splitter = RecursiveCharacterTextSplitter(
+                chunk_size=COMPARATOR_CHUNK_SIZE, chunk_overlap=COMPARATOR_CHUNK_OVERLAP
+            )
             logger.info("DocumentComparator initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing DocumentComparator: {e}")
             raise Exception(f"Error in DocumentComparator initialization: {e}")
+    def _parse_llm_output(self, message):
+        """
+        Validate the LLM's JSON text straight into output_model (no json.loads → dict → model pass).
+        Falls back to the fixing parser for fenced or malformed output, whose dict
+        is validated afterwards by _to_result_dict.
+        """
+        text = getattr(message, "content", message)
+        try:
+            if hasattr(self.output_model, "model_validate_json"):  # pydantic v2
+                return self.output_model.model_validate_json(text)
+            return self.output_model.parse_raw(text)  # pydantic v1
+        except Exception as e:
+            logger.debug("Direct JSON validation failed, using fixing parser: %s", e)
+            return self.fixing_parser.parse(text)
+    def _to_result_dict(self, response: dict) -> dict:
+        """Validate a parsed LLM response against output_model and return it as a dict."""
+        if isinstance(response, BaseModel):  # already validated upstream; just serialize
+            return response.model_dump() if hasattr(response, "model_dump") else response.dict()
+        # JsonOutputParser only uses the schema for format instructions and returns an unvalidated dict,
+        # so this is the single validation pass
+        if hasattr(self.output_model, "model_validate"):  # pydantic v2: Rust validator/serializer
+            return self.output_model.model_validate(response).model_dump()
+        return self.output_model.parse_obj(response).dict()  # pydantic v1 (pinned in requirements.txt)
     def compare_documents(self, input_data: DocumentComparisonInput) -> dict:
         """
         Compare two documents and return structured comparison results.
@@ -46,15 +87,129 @@ class DocumentComparator:
         """
         logger.info("Starting document comparison.")
         try:
-            chain = self.prompt | self.llm | self.fixing_parser
-            response = chain.invoke({
-                "format_instructions": self.parser.get_format_instructions(),
-                "document_1": input_data.document_1,
-                "document_2": input_data.document_2
-            })
-            comparison_obj = self.output_model(**response)
-            logger.info(f"Document comparison complete. Length: {len(response)}")
-            return comparison_obj.dict()
+            h1 = hashlib.sha256(input_data.document_1.encode("utf-8")).digest()
+            h2 = hashlib.sha256(input_data.document_2.encode("utf-8")).digest()
+            if h1 == h2:
+                # Same content (re-upload / compare to self): no LLM round trip needed
+                logger.info("Documents are identical; skipping LLM comparison.")
+                return self._to_result_dict({
+                    "similarities": "Documents are identical.",
+                    "differences": "",
+                    "unique_to_doc1": "",
+                    "unique_to_doc2": "",
+                    "metadata": {"short_circuit": True, "similarity_score": 1.0},
+                })
+            cache_key = (h1, h2)
+            with self._recent_lock:
+                cached = self._recent_results.get(cache_key)
+                if cached is not None:
+                    self._recent_results.move_to_end(cache_key)
+            if cached is not None:
+                logger.info("Document comparison served from recent results cache.")
+                return dict(cached)
+            if max(len(input_data.document_1), len(input_data.document_2)) > LONG_DOCUMENT_CHARS:
+                result = self._compare_long_documents(input_data)
+            else:
+                response = self._chain.invoke({
+                    "format_instructions": self._format_instructions,
+                    "document_1": input_data.document_1,
+                    "document_2": input_data.document_2
+                })
+                result = self._to_result_dict(response)
+            with self._recent_lock:
+                self._recent_results[cache_key] = result
+                while len(self._recent_results) > COMPARISON_CACHE_SIZE:
+                    self._recent_results.popitem(last=False)
+            logger.info("Document comparison complete. Length: %d", len(result))
+            return dict(result)
         except Exception as e:
             logger.error(f"Error during document comparison: {str(e)}")
             raise Exception(f"Document comparison failed: {e}")
+    def _compare_long_documents(self, input_data: DocumentComparisonInput, max_concurrency: int = 8) -> dict:
+        """
+        Map: split both documents, pair chunks by position and compare the pairs in one chain.batch.
+        Reduce: merge the partial results field by field (labelled per part), so no extra LLM call.
+        """
+        chunks_1 = self._splitter.split_text(input_data.document_1)
+        chunks_2 = self._splitter.split_text(input_data.document_2)
+        parts = max(len(chunks_1), len(chunks_2))
+        chunks_1 += [""] * (parts - len(chunks_1))
+        chunks_2 += [""] * (parts - len(chunks_2))
+        logger.info("Long document comparison: %d chunk pairs, max_concurrency=%d", parts, max_concurrency)
+        responses = self._chain.batch(
+            [
+                {
+                    "format_instructions": self._format_instructions,
+                    "document_1": chunk_1,
+                    "document_2": chunk_2
+                }
+                for chunk_1, chunk_2 in zip(chunks_1, chunks_2)
+            ],
+            config={"max_concurrency": max_concurrency}
+        )
+        partials = [self._to_result_dict(response) for response in responses]
+        merged = {
+            field: "\n\n".join(
+                f"[Part {i}] {partial[field]}" for i, partial in enumerate(partials, 1) if partial.get(field)
+            )
+            for field in _MERGED_FIELDS
+        }
+        merged["metadata"] = {"map_reduce": True, "parts": parts}
+        return self._to_result_dict(merged)
+    def compare_documents_batch(self, inputs: List[DocumentComparisonInput], max_concurrency: int = 8) -> List[dict]:
+        """
+        Compare many document pairs with one chain.batch call (provider calls run concurrently).
+        inputs: list of DocumentComparisonInput
+        returns: list of dicts (DocumentComparisonResult as dict), in input order
+        """
+        if not inputs:
+            return []
+        logger.info("Starting batch document comparison: %d pairs, max_concurrency=%d", len(inputs), max_concurrency)
+        try:
+            format_instructions = self._format_instructions
+            responses = self._chain.batch(
+                [
+                    {
+                        "format_instructions": format_instructions,
+                        "document_1": input_data.document_1,
+                        "document_2": input_data.document_2
+                    }
+                    for input_data in inputs
+                ],
+                config={"max_concurrency": max_concurrency}
+            )
+            results = [self._to_result_dict(response) for response in responses]
+            logger.info("Batch document comparison complete. Pairs: %d", len(results))
+            return results
+        except Exception as e:
+            logger.error(f"Error during batch document comparison: {str(e)}")
+            raise Exception(f"Batch document comparison failed: {e}")
+    async def acompare_documents_batch(self, inputs: List[DocumentComparisonInput], max_concurrency: int = 8) -> List[dict]:
+        """Async variant of compare_documents_batch for callers already inside an event loop."""
+        if not inputs:
+            return []
+        try:
+            format_instructions = self._format_instructions
+            responses = await self._chain.abatch(
+                [
+                    {
+                        "format_instructions": format_instructions,
+                        "document_1": input_data.document_1,
+                        "document_2": input_data.document_2
+                    }
+                    for input_data in inputs
+                ],
+                config={"max_concurrency": max_concurrency}
+            )
+            return [self._to_result_dict(response) for response in responses]
+        except Exception as e:
+            logger.error(f"Error during async batch document comparison: {str(e)}")
+            raise Exception(f"Batch document comparison failed: {e}")
+@functools.lru_cache(maxsize=1)
+def get_comparator() -> DocumentComparator:
+    """
+    Lazily built DocumentComparator shared across warm invocations, so the ModelLoader,
+    LLM client, parsers, chain and format instructions are only set up once per container.
+    The cached chain is stateless, so concurrent compare calls can share it.
+    """
+    return DocumentComparator()
@@ -3,6 +3,8 @@ import boto3
 import os
 import uuid
 import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field, validator
@@ -406,6 +408,37 @@ def log_chat_history(event, payload, role, content, reply_to=None, metadata=None
         return None
 
 
+# -----------------------------
+# Background chat logging
+# -----------------------------
+# Single worker keeps list_append order per session; writes overlap with the caller's work
+_log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat_history")
+_pending_logs: List[Future] = []
+_pending_lock = threading.Lock()
+
+def log_chat_history_async(event, payload, role, content, reply_to=None, metadata=None) -> Future:
+    """
+    Queue log_chat_history on a background thread and return immediately.
+    Call flush_chat_history() before the Lambda handler returns so no write is frozen mid-flight.
+    """
+    future = _log_executor.submit(
+        log_chat_history, event, payload, role, content, reply_to=reply_to, metadata=metadata
+    )
+    with _pending_lock:
+        _pending_logs.append(future)
+    return future
+
+def flush_chat_history(timeout: Optional[float] = None) -> None:
+    """Wait for queued chat history writes (log_chat_history already swallows its own errors)."""
+    with _pending_lock:
+        pending = list(_pending_logs)
+        _pending_logs.clear()
+    if not pending:
+        return
+    _, not_done = wait(pending, timeout=timeout)
+    if not_done:
+        logger.warning(f"⚠️ {len(not_done)} chat history write(s) still pending after {timeout}s")
+
 # -----------------------------
 # Helper to simplify logging a model-generated assistant message
 # -----------------------------
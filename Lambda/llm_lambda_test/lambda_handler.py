@@ -20,7 +20,6 @@ except ImportError as e:
 # =====================================================
 # SYSTEM & LIBRARY IMPORTS
 # =====================================================
-import json
 import os
 import datetime
 import boto3
@@ -37,6 +36,7 @@ TEMP_PREFIX = os.getenv("TEMP_DATA_KEY")
 # Local imports
 # ---------------------------
 from utils.logger import CustomLogger
+from utils.json_utils import json_dumps, json_loads
 from rag.rag_pipeline import RAGPipeline
 from rag_simple.rag_simple import SimpleRAGPipeline
 from src.data_ingestion import ingest_document
@@ -71,14 +71,14 @@ def make_response(status_code, body):
                 ),
                 "Content-Type": "application/json"
             },
-            "body": body if isinstance(body, str) else json.dumps(body, default=str)
+            "body": body if isinstance(body, str) else json_dumps(body)
         }
 
         # Optional: add timestamp if not already in body
         if isinstance(body, dict) and "timestamp" not in body:
-            parsed_body = json.loads(response["body"])
+            parsed_body = json_loads(response["body"])
             parsed_body["timestamp"] = datetime.datetime.utcnow().isoformat()
-            response["body"] = json.dumps(parsed_body, default=str)
+            response["body"] = json_dumps(parsed_body)
 
         return response
     except Exception as e:
@@ -99,7 +99,7 @@ def make_response(status_code, body):
                 ),
                 "Content-Type": "application/json"
             },
-            "body": json.dumps({"error": "Response formatting error", "details": str(e)})
+            "body": json_dumps({"error": "Response formatting error", "details": str(e)})
         }
 
 # =====================================================
@@ -115,7 +115,7 @@ def handle_ingest_route(event, payload):
                 first = payload["lambda_upload_responses"][0]
                 body_json = first.get("body")
                 if isinstance(body_json, str):
-                    body_json = json.loads(body_json)
+                    body_json = json_loads(body_json)
                 # Merge body_json back into payload so it has session_id/project_name/user_id
                 payload = {**payload, **body_json}
                 logger.debug(f"✅ Flattened payload now: {payload}")
@@ -256,8 +256,8 @@ def lambda_handler(event, context):
         payload = event.get("payload") or event.get("body", {})
         if isinstance(payload, str):
             try:
-                payload = json.loads(payload)
-            except json.JSONDecodeError:
+                payload = json_loads(payload)
+            except ValueError:  # json.JSONDecodeError / orjson.JSONDecodeError
                 return make_response(400, {"error": "Invalid JSON in request body"})
 
         # Routes
@@ -31,6 +31,10 @@ class DocumentComparisonInput(BaseModel):
     document_1: str
     document_2: str
     extra_instructions: Optional[str] = None
+    class Config:
+        # Unknown keys dropped without checks; immutable, so instances are hashable for memoization
+        extra = "ignore"
+        frozen = True
 # ---------------------------
 # Model for document comparison results
 # ---------------------------
@@ -40,6 +44,9 @@ class DocumentComparisonResult(BaseModel):
     unique_to_doc1: Optional[str] = None
     unique_to_doc2: Optional[str] = None
     metadata: Optional[dict] = None
+    class Config:
+        extra = "ignore"
+        frozen = True
 # ---------------------------
 # Data analysis metadata
 # ---------------------------
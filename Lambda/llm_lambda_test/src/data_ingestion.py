@@ -5,22 +5,56 @@
 import os
 import boto3
 import hashlib
+import threading
 import io  # kept (may be used elsewhere)
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from typing import List, Dict, Any, Union, Optional  # added Optional here
 from utils.metadata import MetadataManager, create_and_check_metadata
 from utils.logger import CustomLogger, CustomException
+from utils.connection_pool import connection_pool
+from utils.ingestion_status import get_ingestion_status_store
+from utils.project_counts import adjust_document_count
 from vector_db.vector_db import QdrantVectorDB
 from utils.split import split_into_chunks, detect_file_type, extract_text
-from chat_history.chat_history import log_chat_history  # ensure direct import
+from chat_history.chat_history import log_chat_history_async, flush_chat_history  # writes run in background
 from pydantic import BaseModel  # restored
 import uuid  # restored
+import numpy as np
 # Model loader imports (OpenAI removed for now)
 from utils.model_loader import ModelLoader, BedrockProvider
+try:
+    import s3fs  # optional: faster GET path for large objects when installed
+except ImportError:
+    s3fs = None
 logger = CustomLogger("PDFIngestionPipeline")
-s3 = boto3.client("s3")
+s3 = connection_pool.get_s3_client()  # shared pooled client (sized for the per-file worker threads)
+_s3_fs = None  # lazily created s3fs.S3FileSystem (reused across warm invocations)
 METADATA_TABLE = os.environ.get("METADATA_TABLE")
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET")
+CHAT_LOG_FLUSH_TIMEOUT = float(os.getenv("CHAT_LOG_FLUSH_TIMEOUT", "5"))
+DEFAULT_EMBEDDING_MODEL = os.getenv("DEFAULT_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+TEMP_DATA_KEY = os.getenv("TEMP_DATA_KEY")
+DOCUMENTS_DATA_KEY = os.getenv("DOCUMENTS_DATA_KEY")
+SUPPORTED_EXTENSIONS = frozenset({".pdf", ".docx", ".txt"})
+# Download/hash slice size (hashlib releases the GIL on slices this large)
+READ_CHUNK_SIZE = 1024 * 1024
+# Objects at/above this size are fetched with parallel ranged GETs (s3transfer)
+MULTIPART_DOWNLOAD_THRESHOLD = int(os.getenv("MULTIPART_DOWNLOAD_THRESHOLD", str(8 * 1024 * 1024)))
+_transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_DOWNLOAD_THRESHOLD,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+# Files ingested concurrently per request (each also fans out its own embedding calls);
+# text extraction runs inline in these workers, which already overlap one file's parse with another's I/O
+INGEST_DOC_WORKERS = int(os.getenv("INGEST_DOC_WORKERS", "4"))
+# Duplicate lookups for the upload's x-amz-meta-sha256 hint, overlapped with the download (one per file worker)
+_lookup_executor = ThreadPoolExecutor(max_workers=INGEST_DOC_WORKERS, thread_name_prefix="dup_lookup")
+# Metadata records are written once this many documents are stored (one BatchWriteItem)
+METADATA_FLUSH_SIZE = 25
 # ---------------------------
 # Ingestion Payload
 # ---------------------------
@@ -60,7 +94,7 @@ class PDFIngestionPipeline:
         # Default embedding model if not provided
         if not embedding_model:
             if embedding_provider == "bedrock":
-                embedding_model = os.getenv("DEFAULT_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+                embedding_model = DEFAULT_EMBEDDING_MODEL
             else:
                 raise ValueError(f"Unsupported embedding provider: {embedding_provider}")
         self.embedding_provider = embedding_provider
@@ -78,7 +112,9 @@ class PDFIngestionPipeline:
         logger.info(f"📦 PDFIngestionPipeline initialized | provider={embedding_provider}, model={embedding_model}")
 
 
-    def process_and_store(self, file_bytes: bytes, metadata: Dict[str, Any]) -> tuple[bool, Dict[str, Any]]:
+    def process_and_store(
+        self, file_bytes: bytes, metadata: Dict[str, Any]
+    ) -> tuple[bool, Dict[str, Any]]:
         """
         Extract text, chunk, embed, and store in Qdrant.
         Uses ModelLoader (embed returns (embedding, meta)).
@@ -113,54 +149,72 @@ class PDFIngestionPipeline:
             logger.info(f"✂️ Split text into {len(chunks)} chunks for doc_id={doc_id}")
             if not chunks:
                 return False, aggregated_emb_meta
-            # 3. Embeddings via model loader
-            embeddings_to_upsert: List[Dict[str, Any]] = []
-            vector_dim: Optional[int] = None
+            # 2b. Deduplicate repeated chunks (headers, footers, boilerplate) so each is embedded once
+            first_index: Dict[str, int] = {}
+            duplicate_counts: Dict[str, int] = {}
             for idx, chunk in enumerate(chunks):
-                try:
-                    logger.debug(
-                        f"🔎 Embedding chunk {idx+1}/{len(chunks)} "
-                        f"(len={len(chunk)}) provider={self.embedding_provider} model={self.embedding_model}"
-                    )
-                    embedding, chunk_emb_meta = self.model_loader.embed(chunk, model_id=self.embedding_model)
-                    if not embedding:
-                        logger.error(f"❌ Empty embedding returned for chunk {idx}")
-                        return False, aggregated_emb_meta
-                    if vector_dim is None:
-                        vector_dim = len(embedding)
-                        logger.info(f"📐 Embedding dimension={vector_dim} (model={self.embedding_model})")
-                    embeddings_to_upsert.append({
-                        "id": str(uuid.uuid4()),
-                        "embedding": embedding,
-                        "metadata": {**metadata, "chunk_id": str(idx)},
-                        "text": chunk,
-                    })
-                    # Aggregate metadata from this chunk
-                    aggregated_emb_meta["total_chunks"] += 1
-                    if chunk_emb_meta.get("cost"):
-                        aggregated_emb_meta["total_cost"] += chunk_emb_meta["cost"]
-                        logger.debug(f"💲 Embedding cost chunk {idx+1}: {chunk_emb_meta['cost']}")
-                    
-                    if chunk_emb_meta.get("usage"):
-                        usage = chunk_emb_meta["usage"]
-                        aggregated_emb_meta["total_tokens_in"] += usage.get("tokens_in", 0)
-                        aggregated_emb_meta["total_tokens_out"] += usage.get("tokens_out", 0)
-                except Exception as e:
-                    logger.error(f"❌ Failed embedding chunk {idx}: {e}")
+                if chunk in first_index:
+                    duplicate_counts[chunk] += 1
+                else:
+                    first_index[chunk] = idx
+                    duplicate_counts[chunk] = 1
+            unique_chunks = list(first_index)
+            if len(unique_chunks) < len(chunks):
+                logger.info(f"🧹 Deduplicated chunks: {len(chunks)} → {len(unique_chunks)} for doc_id={doc_id}")
+            # 3. Embeddings via model loader (all chunks in one concurrent batch)
+            logger.debug(
+                f"🔎 Embedding {len(unique_chunks)} chunks in batch "
+                f"provider={self.embedding_provider} model={self.embedding_model}"
+            )
+            try:
+                embeddings, chunk_emb_metas = self.model_loader.embed_batch(unique_chunks, model_id=self.embedding_model)
+            except Exception as e:
+                logger.error(f"❌ Failed embedding chunks for doc_id={doc_id}: {e}")
+                return False, aggregated_emb_meta
+            vector_dim = len(embeddings[0]) if embeddings[0] else 0
+            logger.info(f"📐 Embedding dimension={vector_dim} (model={self.embedding_model})")
+            # Column-oriented buffers: one shared base payload, one small overlay per point
+            base_payload = self.vector_db.build_payload(metadata)
+            chunk_ids = list(map(str, range(len(chunks))))  # one C-level pass instead of str() per point
+            point_ids: List[Optional[str]] = [None] * len(unique_chunks)
+            payloads: List[Optional[Dict[str, Any]]] = [None] * len(unique_chunks)
+            # One contiguous float32 matrix instead of N lists of boxed Python floats
+            vectors = np.empty((len(unique_chunks), vector_dim), dtype=np.float32)
+            for pos, (chunk, embedding, chunk_emb_meta) in enumerate(zip(unique_chunks, embeddings, chunk_emb_metas)):
+                idx = first_index[chunk]
+                if not embedding or len(embedding) != vector_dim:
+                    logger.error(f"❌ Empty or mis-sized embedding returned for chunk {idx}")
                     return False, aggregated_emb_meta
+                vectors[pos] = embedding
+                point_ids[pos] = str(uuid.uuid4())
+                payload = base_payload.copy()  # dict.copy is cheaper than {**base, ...} unpacking
+                payload["chunk_id"] = chunk_ids[idx]
+                payload["duplicate_count"] = duplicate_counts[chunk]
+                payloads[pos] = payload
+                # Aggregate metadata from this chunk
+                aggregated_emb_meta["total_chunks"] += 1
+                if chunk_emb_meta.get("cost"):
+                    aggregated_emb_meta["total_cost"] += chunk_emb_meta["cost"]
+                
+                if chunk_emb_meta.get("usage"):
+                    usage = chunk_emb_meta["usage"]
+                    aggregated_emb_meta["total_tokens_in"] += usage.get("tokens_in", 0)
+                    aggregated_emb_meta["total_tokens_out"] += usage.get("tokens_out", 0)
+            del embeddings  # release the per-chunk float lists; the matrix holds the data now
             # 4. Upsert into Qdrant
-            success = self.vector_db.upsert_embeddings(embeddings_to_upsert)
+            success = self.vector_db.upsert_embeddings_soa(point_ids, vectors, payloads, unique_chunks)
             if not success:
                 logger.error(f"❌ Failed Qdrant upsert for doc_id={doc_id}")
                 return False, aggregated_emb_meta
             logger.info(
-                f"✅ Successfully ingested {len(chunks)} chunks into Qdrant "
+                f"✅ Successfully ingested {len(unique_chunks)} unique chunks into Qdrant "
                 f"(doc_id={doc_id}, provider={self.embedding_provider}, model={self.embedding_model})"
             )
             
             # Mark success and add final summary to metadata
             aggregated_emb_meta["success"] = True
             aggregated_emb_meta["chunks_processed"] = len(chunks)
+            aggregated_emb_meta["unique_chunks"] = len(unique_chunks)
             if aggregated_emb_meta["total_cost"] > 0:
                 logger.info(f"💰 Total embedding cost: ${aggregated_emb_meta['total_cost']:.6f}")
             
@@ -170,19 +224,148 @@ class PDFIngestionPipeline:
             return False, aggregated_emb_meta
 
 
+# Pipelines (Qdrant client, collection cache, MetadataManager, ModelLoader) reused across invocations
+_PIPELINES: Dict[tuple, PDFIngestionPipeline] = {}
+_pipelines_lock = threading.Lock()
+def get_ingestion_pipeline(embedding_provider: str, embedding_model: str) -> PDFIngestionPipeline:
+    """Return the module-level pipeline for (provider, model), creating it on first use."""
+    key = (embedding_provider, embedding_model)
+    pipeline = _PIPELINES.get(key)
+    if pipeline is None:
+        with _pipelines_lock:
+            pipeline = _PIPELINES.get(key)
+            if pipeline is None:
+                pipeline = PDFIngestionPipeline(
+                    embedding_provider=embedding_provider,
+                    embedding_model=embedding_model,
+                )
+                _PIPELINES[key] = pipeline
+    return pipeline
 def move_file_s3_temp_to_documents(s3_bucket: str, temp_key: str, documents_key: str):
+    copy_file_s3_temp_to_documents(s3_bucket, temp_key, documents_key)
+    delete_temp_objects(s3_bucket, [temp_key])
+def copy_file_s3_temp_to_documents(s3_bucket: str, temp_key: str, documents_key: str):
+    """Server-side copy only; the temp object is removed later by delete_temp_objects."""
     try:
-        logger.info(f"📂 Moving file: {temp_key} → {documents_key} (bucket={s3_bucket})")
+        logger.info(f"📂 Copying file: {temp_key} → {documents_key} (bucket={s3_bucket})")
         s3.copy_object(Bucket=s3_bucket, CopySource={"Bucket": s3_bucket, "Key": temp_key}, Key=documents_key)
-        s3.delete_object(Bucket=s3_bucket, Key=temp_key)
-        logger.info(f"✅ File moved successfully: {temp_key}")
+        logger.info(f"✅ File copied successfully: {temp_key}")
     except ClientError as e:
         logger.error(f"💥 S3 move failed: {str(e)}", exc_info=True)
         raise CustomException(f"Error moving file in S3: {str(e)}")
-def compute_content_hash(file_bytes: bytes) -> str:
-    digest = hashlib.sha256(file_bytes).hexdigest()
-    logger.debug(f"🔑 Computed content hash={digest}")
-    return digest
+def delete_temp_objects(s3_bucket: str, keys: List[str]) -> None:
+    """Delete temp objects with DeleteObjects (1000 keys per call); failures are logged, not raised."""
+    for start in range(0, len(keys), 1000):
+        batch = keys[start:start + 1000]
+        try:
+            response = s3.delete_objects(
+                Bucket=s3_bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            errors = response.get("Errors") or []
+            if errors:
+                logger.warning(f"⚠️ {len(errors)} temp objects not deleted: {errors[:3]}")
+            else:
+                logger.info(f"🧹 Deleted {len(batch)} temp objects")
+        except ClientError as e:
+            logger.warning(f"⚠️ Temp cleanup failed for {len(batch)} objects: {e}")
+def read_s3_object(
+    s3_bucket: str, key: str, hasher=None, size: Optional[int] = None
+) -> Union[bytes, bytearray]:
+    """
+    Download an S3 object into memory (s3fs when installed, boto3 otherwise).
+    hasher: optional hashlib object updated chunk by chunk as bytes arrive.
+    size: object size if already known (from HEAD); large objects then use parallel ranged GETs.
+    """
+    global _s3_fs
+    if size and size >= MULTIPART_DOWNLOAD_THRESHOLD:
+        return _download_ranged(s3_bucket, key, size, hasher)
+    if s3fs is not None:
+        if _s3_fs is None:
+            _s3_fs = s3fs.S3FileSystem(anon=False)
+        with _s3_fs.open(f"{s3_bucket}/{key}", "rb", block_size=READ_CHUNK_SIZE) as f:
+            return _read_into_buffer(f, f.size, hasher)
+    s3_obj = s3.get_object(Bucket=s3_bucket, Key=key)
+    # StreamingBody.readinto keeps botocore's checksum validation and timeout handling
+    return _read_into_buffer(s3_obj["Body"], s3_obj.get("ContentLength"), hasher)
+def _read_into_buffer(stream, length: Optional[int], hasher=None) -> Union[bytes, bytearray]:
+    """
+    Fill a bytearray pre-sized to the object length straight from the stream,
+    hashing each READ_CHUNK_SIZE slice as it lands so hashing overlaps the download.
+    Avoids the chunk join + final copy done by a plain read() on large files.
+    """
+    if not length or not hasattr(stream, "readinto"):
+        data = stream.read()
+        if hasher is not None:
+            hasher.update(data)
+        return data
+    buf = bytearray(length)
+    view = memoryview(buf)
+    filled = 0
+    while filled < length:
+        n = stream.readinto(view[filled:filled + READ_CHUNK_SIZE])
+        if not n:
+            break
+        if hasher is not None:
+            hasher.update(view[filled:filled + n])
+        filled += n
+    if filled != length:
+        raise CustomException(f"Incomplete S3 read: got {filled} of {length} bytes")
+    return buf
+class _BufferWriter:
+    """Seekable file-like over a preallocated bytearray, so s3transfer writes ranges in place."""
+    def __init__(self, buf: bytearray):
+        self._view = memoryview(buf)
+        self._pos = 0
+    def seekable(self) -> bool:
+        return True
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self._pos = offset if whence == 0 else (self._pos + offset if whence == 1 else len(self._view) + offset)
+        return self._pos
+    def tell(self) -> int:
+        return self._pos
+    def write(self, data) -> int:
+        n = len(data)
+        self._view[self._pos:self._pos + n] = data
+        self._pos += n
+        return n
+def _download_ranged(s3_bucket: str, key: str, size: int, hasher=None) -> bytearray:
+    """
+    Parallel ranged GETs (TransferManager) straight into a pre-sized bytearray.
+    Ranges land out of order, so the hash runs once over the finished buffer.
+    """
+    buf = bytearray(size)
+    s3.download_fileobj(s3_bucket, key, _BufferWriter(buf), Config=_transfer_config)
+    if hasher is not None:
+        hasher.update(buf)
+    return buf
+def head_s3_object(s3_bucket: str, key: str) -> tuple[Optional[str], Optional[int], Optional[str]]:
+    """
+    Return (etag, size, sha256) from one HEAD.
+    etag is only set when it is a plain MD5 (single-part upload); multipart ETags
+    ("<md5>-<parts>") are not content hashes and are ignored.
+    sha256 is the x-amz-meta-sha256 header written by the upload handler, if present.
+    It comes from the client, so it is a hint only, never proof of content.
+    """
+    try:
+        head = s3.head_object(Bucket=s3_bucket, Key=key)
+    except ClientError as e:
+        logger.warning(f"⚠️ head_object failed for {key}: {e}")
+        return None, None, None
+    etag = (head.get("ETag") or "").strip('"')
+    if not etag or "-" in etag:
+        etag = None
+    return etag, head.get("ContentLength"), (head.get("Metadata") or {}).get("sha256")
+def s3_object_exists(s3_bucket: str, key: str) -> Optional[bool]:
+    """HEAD key: True/False, or None when S3 could not say (e.g. access or throttling errors)."""
+    try:
+        s3.head_object(Bucket=s3_bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        logger.warning(f"⚠️ head_object failed for {key}: {e}")
+        return None
 def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionResponse]:
     """
     Validate payload, fetch file(s) from S3 temp, compute hash, check metadata,
@@ -212,15 +395,12 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
     embedding_model = payload.get("embedding_model")
     if not embedding_model:
         if embedding_provider == "bedrock":
-            embedding_model = os.environ.get("DEFAULT_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+            embedding_model = DEFAULT_EMBEDDING_MODEL
         else:  # placeholder for future providers
             embedding_model = "default-model"
         logger.info(f"ℹ️ Using default embedding model '{embedding_model}' for provider '{embedding_provider}'")
-    # Initialize pipeline with provider + model
-    pipeline = PDFIngestionPipeline(
-        embedding_provider=embedding_provider,
-        embedding_model=embedding_model,
-    )
+    # Reuse the warm container's pipeline for this provider + model
+    pipeline = get_ingestion_pipeline(embedding_provider, embedding_model)
     # Log ingestion start to chat history
     try:
         doc_list = []
@@ -230,7 +410,7 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
             doc_list.extend(payload["doc_locs"])
         files_text = ", ".join(doc_list) if doc_list else "multiple files"
         start_message = f"🚀 Starting document ingestion for: {files_text} (provider={embedding_provider}, model={embedding_model})"
-        log_chat_history(
+        log_chat_history_async(
             event={},
             payload=payload,
             role="system",
@@ -246,20 +426,42 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
     if payload.get("doc_locs"):
         doc_locs.extend(payload["doc_locs"])
     logger.debug(f"📄 Files to ingest={doc_locs}")
-    temp_prefix = os.getenv("TEMP_DATA_KEY")
-    documents_prefix = os.getenv("DOCUMENTS_DATA_KEY")
+    temp_prefix = TEMP_DATA_KEY
+    documents_prefix = DOCUMENTS_DATA_KEY
     logger.debug(f"📂 Prefixes → TEMP={temp_prefix}, DOCS={documents_prefix}")
-    results: List[IngestionResponse] = []
-    for doc_loc in doc_locs:
+    # Per-request key bases; each file only appends its name
+    temp_base = f"{temp_prefix}/{project_name}/"
+    doc_base = f"{documents_prefix}/{project_name}/"
+    # Metadata of stored documents, flushed with BatchWriteItem every METADATA_FLUSH_SIZE records
+    # and before any temp object is deleted
+    pending_writes: List[Dict[str, Any]] = []
+    # Temp keys whose metadata could not be written: kept in temp so the file can be re-ingested
+    unflushed_temp_keys: set = set()
+    # Temp objects already copied to documents; removed with one DeleteObjects call at the end
+    moved_temp_keys: List[str] = []
+    # Documents stored under a key that did not exist yet (re-ingests overwrite and are not counted)
+    new_document_count = 0
+    # Hashes claimed by a file in this request (guards same-content files running concurrently)
+    ingested_hashes: set = set()
+    state_lock = threading.Lock()
+    status_store = get_ingestion_status_store()
+    def _flush_metadata(records: Optional[List[Dict[str, Any]]]) -> None:
+        if records and not pipeline.metadata_manager.save_metadata_batch(records):
+            logger.error(f"❌ Failed to batch save {len(records)} metadata records")
+            with state_lock:
+                unflushed_temp_keys.update(record["s3_key"] for record in records)
+    def _ingest_single(doc_loc: str) -> IngestionResponse:
+        """Run one file through download → hash → dedup → embed → move (called from worker threads)."""
+        nonlocal new_document_count
         try:
-            temp_s3_key = f"{temp_prefix}/{project_name}/{doc_loc}"
-            doc_s3_key = f"{documents_prefix}/{project_name}/{doc_loc}"
+            temp_s3_key = temp_base + doc_loc
+            doc_s3_key = doc_base + doc_loc
             logger.info(f"🔗 Constructed S3 keys: temp={temp_s3_key}, doc={doc_s3_key}")
-            if not doc_loc.lower().endswith((".pdf", ".docx", ".txt")):
+            if os.path.splitext(doc_loc)[1].lower() not in SUPPORTED_EXTENSIONS:
                 logger.warning(f"⚠️ Skipping unsupported file type: {doc_loc}")
                 try:
                     unsupported_message = f"⚠️ Unsupported file type: {doc_loc} (only PDF, DOCX, and TXT files are supported)"
-                    log_chat_history(
+                    log_chat_history_async(
                         event={},
                         payload=payload,
                         role="system",
@@ -268,25 +470,60 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                     )
                 except Exception as e:
                     logger.warning(f"⚠️ Failed to log unsupported file type to chat history: {e}")
-                results.append(
-                    IngestionResponse(
-                        statusCode=415,
-                        body=f"Unsupported file type: {doc_loc}",
-                        s3_bucket=s3_bucket,
-                        s3_key=temp_s3_key,
-                        embedding_provider=embedding_provider,
-                        embedding_model=embedding_model,
+                return IngestionResponse(
+                    statusCode=415,
+                    body=f"Unsupported file type: {doc_loc}",
+                    s3_bucket=s3_bucket,
+                    s3_key=temp_s3_key,
+                    embedding_provider=embedding_provider,
+                    embedding_model=embedding_model,
+                )
+            # Cheap HEAD first: a single-part ETag is the file's MD5 (computed by S3), so known files skip the download
+            etag, object_size, header_hash = head_s3_object(s3_bucket, temp_s3_key)
+            if object_size is not None and status_store is not None:
+                # The object has landed: only now does it count as processing in document status
+                if not status_store.mark_processing(project_name, temp_s3_key, size=object_size):
+                    logger.warning(f"⚠️ Could not record processing status for {temp_s3_key}")
+            if etag and pipeline.metadata_manager.check_etag_exists(etag, embedding_model):
+                logger.warning(f"⚠️ HEAD match → document already fully processed, skipping download: {doc_loc}")
+                try:
+                    log_chat_history_async(
+                        event={},
+                        payload=payload,
+                        role="system",
+                        content=f"⚠️ Document already fully processed: {doc_loc} (matched before download)",
+                        metadata={
+                            "action": "fully_processed_skip",
+                            "filename": doc_loc,
+                            "embedding_model": embedding_model,
+                            "embedding_provider": embedding_provider,
+                        },
                     )
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to log fully processed skip to chat history: {e}")
+                return IngestionResponse(
+                    statusCode=409,
+                    body=f"Document already fully processed: {doc_loc}",
+                    s3_bucket=s3_bucket,
+                    s3_key=doc_s3_key,
+                    embedding_provider=embedding_provider,
+                    embedding_model=embedding_model,
                 )
-                continue
+            if header_hash:
+                # Client-supplied hash is only a hint: warm the lookup during the download,
+                # the duplicate decision below uses the hash computed from the downloaded bytes
+                _lookup_executor.submit(pipeline.metadata_manager.prefetch_hash_lookup, header_hash.lower())
             logger.info(f"⬇️ Downloading {temp_s3_key} from {s3_bucket}")
-            s3_obj = s3.get_object(Bucket=s3_bucket, Key=temp_s3_key)
-            file_bytes = s3_obj["Body"].read()
+            hasher = hashlib.sha256()
+            file_bytes = read_s3_object(s3_bucket, temp_s3_key, hasher=hasher, size=object_size)
             logger.info(f"📦 Downloaded {temp_s3_key} (size={len(file_bytes)} bytes)")
             # Detect file type (new)
             detected_type = detect_file_type(doc_loc, file_bytes)
             logger.info(f"🧪 Detected file_type={detected_type} for {doc_loc}")
-            content_hash = compute_content_hash(file_bytes)
+            content_hash = hasher.hexdigest()  # computed while downloading
+            logger.debug(f"🔑 Computed content hash={content_hash}")
+            if header_hash and header_hash != content_hash:
+                logger.warning(f"⚠️ x-amz-meta-sha256 does not match downloaded content for {doc_loc}")
             ingest_source = payload.get("ingest_source") or "user_upload"
             source_path = payload.get("source_path") or "UI"
             logger.debug(
@@ -307,8 +544,15 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                 filename=doc_loc,
                 file_type=detected_type or "unknown",
                 file_size=len(file_bytes),
+                auto_save=False,  # Saved in one batch after all documents are processed
                 verify_embeddings=True,  # Enable vector DB verification
             )
+            with state_lock:
+                if content_hash in ingested_hashes:
+                    # Same content already claimed by another file in this batch (its metadata write is still pending)
+                    exists["should_skip"] = True
+                else:
+                    ingested_hashes.add(content_hash)
             # Enhanced duplicate checking logic
             if exists.get("should_skip"):
                 logger.warning(f"⚠️ Document fully processed (metadata + embeddings verified) → {doc_loc}")
@@ -316,7 +560,7 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                     duplicate_message = (
                         f"⚠️ Document already fully processed: {doc_loc} (both metadata and embeddings exist in vector database)"
                     )
-                    log_chat_history(
+                    log_chat_history_async(
                         event={},
                         payload=payload,
                         role="system",
@@ -330,24 +574,21 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                     )
                 except Exception as e:
                     logger.warning(f"⚠️ Failed to log fully processed skip to chat history: {e}")
-                results.append(
-                    IngestionResponse(
-                        statusCode=409,
-                        body=f"Document already fully processed: {doc_loc}",
-                        s3_bucket=s3_bucket,
-                        s3_key=doc_s3_key,
-                        embedding_provider=embedding_provider,
-                        embedding_model=embedding_model,
-                    )
+                return IngestionResponse(
+                    statusCode=409,
+                    body=f"Document already fully processed: {doc_loc}",
+                    s3_bucket=s3_bucket,
+                    s3_key=doc_s3_key,
+                    embedding_provider=embedding_provider,
+                    embedding_model=embedding_model,
                 )
-                continue
             elif exists.get("exact_exists") and not exists.get("embeddings_verified"):
                 logger.warning(f"⚠️ Metadata exists but embeddings missing in vector DB → will reprocess {doc_loc}")
                 try:
                     reprocess_message = (
                         f"⚠️ Incomplete processing detected for: {doc_loc} (metadata exists but embeddings missing in vector database, will reprocess)"
                     )
-                    log_chat_history(
+                    log_chat_history_async(
                         event={},
                         payload=payload,
                         role="system",
@@ -367,17 +608,18 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                 )
             else:
                 logger.info(f"✅ No duplicates found for {doc_loc}")
-            if exists.get("saved"):
-                logger.info(f"✅ Metadata saved successfully to DynamoDB")
-            else:
-                logger.info(f"ℹ️ Metadata not saved (duplicate or error)")
+            if etag:
+                metadata["etag"] = etag  # Sparse etag-index key; omitted for multipart uploads
+            metadata["status"] = "uploaded"
             logger.info(f"⚙️ Running embedding pipeline for {doc_loc}")
             ok , emb_meta = pipeline.process_and_store(file_bytes, metadata)
             if not ok:
                 logger.error(f"❌ Embedding pipeline failed for {doc_loc}")
+                with state_lock:
+                    ingested_hashes.discard(content_hash)  # let a same-content file retry
                 try:
                     error_message = f"❌ Failed to process embeddings for: {doc_loc}"
-                    log_chat_history(
+                    log_chat_history_async(
                         event={},
                         payload=payload,
                         role="system",
@@ -392,21 +634,31 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                     )
                 except Exception as e:
                     logger.warning(f"⚠️ Failed to log embedding error to chat history: {e}")
-                results.append(
-                    IngestionResponse(
-                        statusCode=500,
-                        body=f"Embedding pipeline failed: {doc_loc}",
-                        s3_bucket=s3_bucket,
-                        s3_key=doc_s3_key,
-                        embedding_provider=embedding_provider,
-                        embedding_model=embedding_model,
-                    )
+                return IngestionResponse(
+                    statusCode=500,
+                    body=f"Embedding pipeline failed: {doc_loc}",
+                    s3_bucket=s3_bucket,
+                    s3_key=doc_s3_key,
+                    embedding_provider=embedding_provider,
+                    embedding_model=embedding_model,
                 )
-                continue
-            move_file_s3_temp_to_documents(s3_bucket, temp_s3_key, doc_s3_key)
+            is_new_document = s3_object_exists(s3_bucket, doc_s3_key) is False
+            copy_file_s3_temp_to_documents(s3_bucket, temp_s3_key, doc_s3_key)
+            # Embeddings stored and document in place: only now is its metadata record queued
+            flush_batch = None
+            with state_lock:
+                moved_temp_keys.append(temp_s3_key)
+                if is_new_document:
+                    new_document_count += 1
+                pending_writes.append(metadata)
+                logger.info(f"📝 Metadata queued for batch write ({len(pending_writes)} pending)")
+                if len(pending_writes) >= METADATA_FLUSH_SIZE:
+                    flush_batch = pending_writes[:]
+                    pending_writes.clear()
+            _flush_metadata(flush_batch)
             try:
                 success_message = f"✅ Successfully ingested document: {doc_loc}"
-                log_chat_history(
+                log_chat_history_async(
                     event={},
                     payload=payload,
                     role="system",
@@ -423,24 +675,22 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                 )
             except Exception as e:
                 logger.warning(f"⚠️ Failed to log successful ingestion to chat history: {e}")
-            results.append(
-                IngestionResponse(
-                    statusCode=201,
-                    body=f"✅ Document ingested successfully: {doc_loc}",
-                    s3_bucket=s3_bucket,
-                    s3_key=doc_s3_key,
-                    ingest_source=ingest_source,
-                    source_path=source_path,
-                    embedding_provider=embedding_provider,
-                    embedding_model=embedding_model,
-                    metadata=metadata,
-                )
+            return IngestionResponse(
+                statusCode=201,
+                body=f"✅ Document ingested successfully: {doc_loc}",
+                s3_bucket=s3_bucket,
+                s3_key=doc_s3_key,
+                ingest_source=ingest_source,
+                source_path=source_path,
+                embedding_provider=embedding_provider,
+                embedding_model=embedding_model,
+                metadata=metadata,
             )
         except Exception as e:
             logger.error(f"💥 Unexpected error ingesting {doc_loc}: {e}", exc_info=True)
             try:
                 error_message = f"💥 Unexpected error occurred while ingesting: {doc_loc} - {str(e)}"
-                log_chat_history(
+                log_chat_history_async(
                     event={},
                     payload=payload,
                     role="system",
@@ -449,23 +699,56 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
                 )
             except Exception as chat_error:
                 logger.warning(f"⚠️ Failed to log unexpected error to chat history: {chat_error}")
-            results.append(
-                IngestionResponse(
-                    statusCode=500,
-                    body=f"Unexpected error ingesting {doc_loc}: {str(e)}",
-                    s3_bucket=s3_bucket,
-                    s3_key=getattr(locals(), 'doc_s3_key', getattr(locals(), 'temp_s3_key', "")),
-                    embedding_provider=embedding_provider,
-                    embedding_model=embedding_model,
-                )
+            return IngestionResponse(
+                statusCode=500,
+                body=f"Unexpected error ingesting {doc_loc}: {str(e)}",
+                s3_bucket=s3_bucket,
+                s3_key=getattr(locals(), 'doc_s3_key', getattr(locals(), 'temp_s3_key', "")),
+                embedding_provider=embedding_provider,
+                embedding_model=embedding_model,
             )
-    summary = {
-        "total": len(results),
-        "succeeded": sum(1 for r in results if r.statusCode in (200, 201)),
-        "duplicates": sum(1 for r in results if r.statusCode == 409),
-        "unsupported": sum(1 for r in results if r.statusCode == 415),
-        "errors": sum(1 for r in results if r.statusCode >= 500),
-    }
+    # Files are independent and I/O bound; map keeps results in doc_locs order
+    workers = max(1, min(INGEST_DOC_WORKERS, len(doc_locs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest_doc") as executor:
+        results: List[IngestionResponse] = list(executor.map(_ingest_single, doc_locs))
+    # Metadata goes first: a timeout after this point never leaves stored vectors without records
+    _flush_metadata(pending_writes)
+    if unflushed_temp_keys:
+        logger.warning(f"⚠️ Keeping {len(unflushed_temp_keys)} temp files whose metadata was not saved")
+    deletable_temp_keys = [key for key in moved_temp_keys if key not in unflushed_temp_keys]
+    if deletable_temp_keys:
+        delete_temp_objects(s3_bucket, deletable_temp_keys)
+    if status_store is not None and doc_locs:
+        # Every file ends in a terminal status so no row is left counted as processing
+        moved = set(deletable_temp_keys)
+        final_statuses = {}
+        for doc_loc, r in zip(doc_locs, results):
+            temp_s3_key = temp_base + doc_loc
+            if temp_s3_key in moved:
+                final_statuses[temp_s3_key] = "completed"
+            elif r.statusCode == 409:
+                final_statuses[temp_s3_key] = "duplicate"
+            elif r.statusCode == 415:
+                final_statuses[temp_s3_key] = "unsupported"
+            else:
+                final_statuses[temp_s3_key] = "failed"
+        if not status_store.mark_finished(project_name, final_statuses):
+            logger.warning(f"⚠️ Failed to record final status for {len(final_statuses)} files in ingestion status table")
+    if new_document_count:
+        # Keeps get_project's document_count current without listing the project prefix
+        adjust_document_count(project_name, new_document_count)
+    # Single pass over results; every key is always present for the summary message below
+    summary = {"total": len(results), "succeeded": 0, "duplicates": 0, "unsupported": 0, "errors": 0}
+    for r in results:
+        code = r.statusCode
+        if code in (200, 201):
+            summary["succeeded"] += 1
+        elif code == 409:
+            summary["duplicates"] += 1
+        elif code == 415:
+            summary["unsupported"] += 1
+        elif code >= 500:
+            summary["errors"] += 1
     logger.info(f"📊 Ingestion summary={summary}")
     try:
         summary_message = (
@@ -476,7 +759,7 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
             f"Unsupported: {summary['unsupported']}, "
             f"Errors: {summary['errors']}"\
         )
-        log_chat_history(
+        log_chat_history_async(
             event={},
             payload=payload,
             role="system",
@@ -490,6 +773,8 @@ def ingest_document(payload: dict) -> Union[IngestionResponse, BatchIngestionRes
         )
     except Exception as e:
         logger.warning(f"⚠️ Failed to log ingestion summary to chat history: {e}")
+    # Drain queued chat history writes before the runtime freezes the container
+    flush_chat_history(timeout=CHAT_LOG_FLUSH_TIMEOUT)
     return BatchIngestionResponse(results=results, summary=summary)
 
 
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Modules import each other as top-level packages (utils.*, ui.*), as in the Lambda image
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,32 @@
+import threading
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("qdrant_client")
+
+from ui import batch_operation  # noqa: E402
+
+
+def test_batch_ingest_gives_each_worker_one_document(monkeypatch):
+    seen = []
+    lock = threading.Lock()
+
+    def _ingest(payload):
+        with lock:
+            seen.append((payload["doc_loc"], list(payload["doc_locs"])))
+        return {"ingested": payload["doc_loc"]}
+
+    monkeypatch.setattr(batch_operation, "ingest_document", _ingest)
+    monkeypatch.setattr(batch_operation, "_warm_pipeline_with_retry", lambda payload: None)
+    payload = {
+        "project_name": "p",
+        "doc_loc": "shared.pdf",
+        "doc_locs": ["a.pdf", "b.pdf"],
+        "max_concurrency": 4,
+    }
+
+    response = batch_operation.handle_batch_ingest(["a.pdf", "b.pdf", "c.pdf"], "p", payload)
+
+    assert response["statusCode"] == 200
+    assert sorted(seen) == [("a.pdf", []), ("b.pdf", []), ("c.pdf", [])]
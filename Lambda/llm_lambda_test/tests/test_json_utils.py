@@ -0,0 +1,26 @@
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("qdrant_client")
+
+from ui.batch_operation import IngestResult  # noqa: E402
+from utils import json_utils  # noqa: E402
+
+
+def test_stdlib_fallback_serializes_dataclasses(monkeypatch):
+    monkeypatch.setattr(json_utils, "orjson", None)
+    results = [
+        IngestResult(document="a.pdf", status="success", result={"count": Decimal("2")}),
+        IngestResult(document="b.pdf", status="error", error="boom", result={"lock": threading.Lock()}),
+    ]
+
+    body = json_utils.json_loads(json_utils.json_dumps({"results": results, "at": datetime(2024, 1, 1)}))
+
+    assert body["results"][0] == {"document": "a.pdf", "status": "success", "result": {"count": 2}, "error": None}
+    assert body["results"][1]["status"] == "error"
+    assert isinstance(body["results"][1]["result"]["lock"], str)
+    assert body["at"] == "2024-01-01T00:00:00+00:00"
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("qdrant_client")
+
+from utils import metadata  # noqa: E402
+
+
+@pytest.fixture
+def fake_query(monkeypatch):
+    """Replace the GSI query with a recorder; results[value] is returned, or raised if an exception."""
+    calls = []
+    results = {}
+
+    def _query(table_name, index_name, attribute, value):
+        calls.append((index_name, value))
+        result = results.get(value, ())
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(metadata, "_query_index", _query)
+    metadata.clear_hash_lookup_cache()
+    yield calls, results
+    metadata.clear_hash_lookup_cache()
+
+
+def test_positive_lookup_is_cached(fake_query):
+    calls, results = fake_query
+    results["h1"] = ({"document_id": "d1"},)
+    assert metadata._cached_hash_lookup("t", "h1") == ({"document_id": "d1"},)
+    assert metadata._cached_hash_lookup("t", "h1") == ({"document_id": "d1"},)
+    assert len(calls) == 1
+
+
+def test_empty_lookup_is_not_cached(fake_query):
+    calls, results = fake_query
+    assert metadata._cached_hash_lookup("t", "h2") == ()
+    results["h2"] = ({"document_id": "d2"},)  # written by another container
+    assert metadata._cached_hash_lookup("t", "h2") == ({"document_id": "d2"},)
+    assert len(calls) == 2
+
+
+def test_errors_propagate_and_are_not_cached(fake_query):
+    calls, results = fake_query
+    results["h3"] = RuntimeError("throttled")
+    with pytest.raises(RuntimeError):
+        metadata._cached_hash_lookup("t", "h3")
+    results["h3"] = ({"document_id": "d3"},)
+    assert metadata._cached_hash_lookup("t", "h3") == ({"document_id": "d3"},)
+    assert len(calls) == 2
+
+
+def test_clear_invalidates_hash_and_etag_lookups(fake_query):
+    calls, results = fake_query
+    results["v"] = ({"document_id": "d4"},)
+    metadata._cached_hash_lookup("t", "v")
+    metadata._cached_etag_lookup("t", "v")
+    assert calls == [("content_hash-index", "v"), ("etag-index", "v")]
+    metadata.clear_hash_lookup_cache()
+    metadata._cached_hash_lookup("t", "v")
+    metadata._cached_etag_lookup("t", "v")
+    assert len(calls) == 4
+
+
+def test_positive_lookup_expires_after_ttl(fake_query, monkeypatch):
+    calls, results = fake_query
+    monkeypatch.setattr(metadata, "LOOKUP_CACHE_TTL_S", 0)
+    results["h5"] = ({"document_id": "d5"},)
+    metadata._cached_hash_lookup("t", "h5")
+    metadata._cached_hash_lookup("t", "h5")
+    assert len(calls) == 2
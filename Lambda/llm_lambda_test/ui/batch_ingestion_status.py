@@ -12,9 +12,14 @@ Responsibilities:
 # Imports
 # ======================================================
 import os
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
 
 from utils.logger import CustomLogger
-from utils.dynamodb import get_item_from_dynamo, scan_table
+from utils.dynamodb import EnhancedDynamoDBClient
 from Lambda.llm_lambda_test.lambda_handler import make_response
 
 # ======================================================
@@ -22,6 +27,85 @@ from Lambda.llm_lambda_test.lambda_handler import make_response
 # ======================================================
 logger = CustomLogger(__name__)
 PROJECT_CONFIG_TABLE = os.environ.get("PROJECT_CONFIG_TABLE")
+# GSI on PROJECT_CONFIG_TABLE: hash key project_name, range key record_type
+PROJECT_RECORD_TYPE_INDEX = os.environ.get("PROJECT_RECORD_TYPE_INDEX", "project_name-record_type-index")
+# Concurrent per-project GSI queries in handle_batch_ingestion_status_multi
+MULTI_STATUS_WORKERS = int(os.environ.get("MULTI_STATUS_WORKERS", "8"))
+
+
+# ======================================================
+# Helpers
+# ======================================================
+def _iter_ingestion_records(dynamodb, project_name):
+    """
+    Yield one project's ingestion records from the GSI (no table scan).
+    Falls back to a paginated, filtered Scan while PROJECT_RECORD_TYPE_INDEX does not exist yet;
+    any other error propagates instead of reading as an empty project.
+    """
+    yielded = False
+    try:
+        for item in dynamodb.iter_query_items(
+            PROJECT_CONFIG_TABLE,
+            key_condition_expression="project_name = :project_name AND record_type = :record_type",
+            expression_attribute_values={
+                ":project_name": project_name,
+                ":record_type": "ingestion",
+            },
+            index_name=PROJECT_RECORD_TYPE_INDEX,
+        ):
+            yielded = True
+            yield item
+        return
+    except ClientError as e:
+        # A missing index fails the first page; anything later would double count
+        if yielded or e.response["Error"]["Code"] != "ValidationException":
+            raise
+        logger.warning(
+            "⚠️ %s unavailable on %s, scanning instead: %s", PROJECT_RECORD_TYPE_INDEX, PROJECT_CONFIG_TABLE, e
+        )
+    table = dynamodb.get_table(PROJECT_CONFIG_TABLE)
+    params = {"FilterExpression": Attr("project_name").eq(project_name) & Attr("record_type").eq("ingestion")}
+    while True:
+        response = table.scan(**params)
+        yield from response.get("Items", [])
+        if not response.get("LastEvaluatedKey"):
+            break
+        params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _build_batch_status(dynamodb, project_name, session_id, project_status):
+    """Query one project's ingestion records and build its status summary (raises if they cannot be read)"""
+    # --------------------------------------------------
+    # Get ingestion history for this session/project
+    # --------------------------------------------------
+    # Counted while streaming every page; only the last 10 records are kept in memory
+    status_counts = Counter()
+    recent_history = deque(maxlen=10)
+    for item in _iter_ingestion_records(dynamodb, project_name):
+        status_counts[item.get("status")] += 1
+        recent_history.append(item)
+
+    # --------------------------------------------------
+    # Calculate batch statistics
+    # --------------------------------------------------
+    total_documents = sum(status_counts.values())
+    successful_documents = status_counts.get("completed", 0)
+    failed_documents = status_counts.get("failed", 0)
+    in_progress_documents = status_counts.get("processing", 0)
+
+    batch_status = {
+        "project_name": project_name,
+        "session_id": session_id,
+        "total_documents": total_documents,
+        "successful_documents": successful_documents,
+        "failed_documents": failed_documents,
+        "in_progress_documents": in_progress_documents,
+        "completion_percentage": (successful_documents / total_documents * 100) if total_documents > 0 else 0,
+        "project_status": project_status.get("status", "unknown"),
+        "last_updated": project_status.get("last_updated"),
+        "ingestion_history": list(recent_history),  # Last 10 records
+    }
+    return batch_status
 
 
 # ======================================================
@@ -43,60 +127,64 @@ def handle_batch_ingestion_status(event, payload):
         # --------------------------------------------------
         # Get overall project status
         # --------------------------------------------------
+        dynamodb = EnhancedDynamoDBClient()
         try:
-            project_status = get_item_from_dynamo(
+            project_status = dynamodb.get_item(
                 PROJECT_CONFIG_TABLE,
                 {"project_name": project_name},
-            )
+            ) or {}
         except Exception as e:
-            logger.warning(f"⚠️ Could not get project status: {e}")
+            logger.warning("⚠️ Could not get project status: %s", e)
             project_status = {}
 
-        # --------------------------------------------------
-        # Get ingestion history for this session/project
-        # --------------------------------------------------
-        try:
-            ingestion_history = []
-            scan_result = scan_table(
-                PROJECT_CONFIG_TABLE,
-                filter_expression="project_name = :project_name",
-                expression_attribute_values={":project_name": project_name},
-            )
-
-            for item in scan_result.get("Items", []):
-                if item.get("record_type") == "ingestion" or "ingestion" in str(item):
-                    ingestion_history.append(item)
-
-        except Exception as e:
-            logger.warning(f"⚠️ Could not get ingestion history: {e}")
-            ingestion_history = []
-
-        # --------------------------------------------------
-        # Calculate batch statistics
-        # --------------------------------------------------
-        total_documents = len(ingestion_history)
-        successful_documents = len([h for h in ingestion_history if h.get("status") == "completed"])
-        failed_documents = len([h for h in ingestion_history if h.get("status") == "failed"])
-        in_progress_documents = len([h for h in ingestion_history if h.get("status") == "processing"])
-
-        batch_status = {
-            "project_name": project_name,
-            "session_id": session_id,
-            "total_documents": total_documents,
-            "successful_documents": successful_documents,
-            "failed_documents": failed_documents,
-            "in_progress_documents": in_progress_documents,
-            "completion_percentage": (successful_documents / total_documents * 100) if total_documents > 0 else 0,
-            "project_status": project_status.get("status", "unknown"),
-            "last_updated": project_status.get("last_updated"),
-            "ingestion_history": ingestion_history[-10:] if ingestion_history else [],  # Last 10 records
-        }
+        batch_status = _build_batch_status(dynamodb, project_name, session_id, project_status)
+        successful_documents = batch_status["successful_documents"]
+        total_documents = batch_status["total_documents"]
 
         logger.info(
-            f"📊 Batch status for {project_name}: {successful_documents}/{total_documents} completed"
+            "📊 Batch status for %s: %d/%d completed", project_name, successful_documents, total_documents
         )
         return make_response(200, batch_status)
 
     except Exception as e:
         logger.error(f"💥 Error getting batch ingestion status: {e}", exc_info=True)
         return make_response(500, f"Error getting batch status: {str(e)}")
+
+
+def handle_batch_ingestion_status_multi(event, payload):
+    """
+    Batch ingestion status for several projects at once:
+    - One BatchGetItem for all project rows (100 keys per call)
+    - Per-project GSI queries run concurrently
+    - Returns {"projects": {project_name: batch_status}}
+    """
+    try:
+        project_names = list(dict.fromkeys(payload.get("project_names") or []))  # de-dupe, keep order
+        session_id = payload.get("session_id")
+
+        if not project_names:
+            return make_response(400, "Missing required parameter: project_names")
+
+        dynamodb = EnhancedDynamoDBClient()
+        project_rows = dynamodb.batch_get_items(
+            PROJECT_CONFIG_TABLE,
+            [{"project_name": name} for name in project_names],
+        )
+        project_statuses = {row.get("project_name"): row for row in project_rows}
+
+        workers = min(MULTI_STATUS_WORKERS, len(project_names))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch_status") as executor:
+            statuses = executor.map(
+                lambda name: _build_batch_status(
+                    dynamodb, name, session_id, project_statuses.get(name, {})
+                ),
+                project_names,
+            )
+            projects = dict(zip(project_names, statuses))
+
+        logger.info("📊 Batch status built for %d projects", len(projects))
+        return make_response(200, {"projects": projects})
+
+    except Exception as e:
+        logger.error(f"💥 Error getting multi-project batch status: {e}", exc_info=True)
+        return make_response(500, f"Error getting batch status: {str(e)}")
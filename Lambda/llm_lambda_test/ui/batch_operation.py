@@ -1,10 +1,30 @@
-import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
 
 from utils.logger import CustomLogger
-from src.data_ingestion import ingest_document
+from utils.json_utils import json_dumps
+from src.data_ingestion import DEFAULT_EMBEDDING_MODEL, get_ingestion_pipeline, ingest_document
 
 logger = CustomLogger(__name__)
 
+# Documents ingested concurrently (payload "max_concurrency" overrides, capped at the hard limit)
+BATCH_INGEST_CONCURRENCY = int(os.getenv("BATCH_INGEST_CONCURRENCY", "10"))
+BATCH_INGEST_MAX_CONCURRENCY = 16
+BATCH_INGEST_RETRIES = int(os.getenv("BATCH_INGEST_RETRIES", "2"))
+BATCH_INGEST_BACKOFF_S = 0.5
+
+
+@dataclass(slots=True)
+class IngestResult:
+    """Per-document batch ingest outcome (no per-instance __dict__; orjson serializes it natively)"""
+    document: str
+    status: str
+    result: Any = None
+    error: Optional[str] = None
+
 
 def handle_batch_operations(event, payload):
     """
@@ -19,7 +39,7 @@ def handle_batch_operations(event, payload):
         if not all([operation, documents, project_name]):
             return {
                 "statusCode": 400,
-                "body": json.dumps(
+                "body": json_dumps(
                     {"error": "operation, documents, and project_name are required"}
                 ),
             }
@@ -33,50 +53,79 @@ def handle_batch_operations(event, payload):
         else:
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": "Invalid operation"}),
+                "body": json_dumps({"error": "Invalid operation"}),
             }
 
     except Exception as e:
         logger.error(f"Error in batch operations: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": str(e)}),
+            "body": json_dumps({"error": str(e)}),
         }
 
 
-def handle_batch_ingest(documents, project_name, payload):
-    """Handle batch ingestion of multiple documents"""
-    results = []
-
-    for doc in documents:
+def _warm_pipeline_with_retry(payload):
+    """
+    Build the shared ingestion pipeline (Qdrant, DynamoDB, Bedrock clients) before the fan-out,
+    retrying transient failures with exponential backoff. This step has no side effects;
+    ingest_document itself is never retried (it moves S3 objects, bumps counters, upserts vectors).
+    """
+    embedding_provider = (payload.get("embedding_provider") or "bedrock").lower()
+    if embedding_provider != "bedrock":
+        return  # ingest_document reports unsupported providers per document
+    embedding_model = payload.get("embedding_model") or DEFAULT_EMBEDDING_MODEL
+    for attempt in range(BATCH_INGEST_RETRIES + 1):
         try:
-            doc_payload = {**payload, "file_path": doc}
-            result = ingest_document(doc_payload)
-            results.append(
-                {
-                    "document": doc,
-                    "status": "success",
-                    "result": result.dict() if hasattr(result, "dict") else result,
-                }
-            )
+            get_ingestion_pipeline(embedding_provider, embedding_model)
+            return
         except Exception as e:
-            results.append(
-                {
-                    "document": doc,
-                    "status": "error",
-                    "error": str(e),
-                }
-            )
+            if attempt == BATCH_INGEST_RETRIES:
+                logger.error(f"❌ Ingestion pipeline setup failed after {attempt + 1} attempts: {e}")
+                return
+            delay = BATCH_INGEST_BACKOFF_S * (2 ** attempt)
+            logger.warning(f"⚠️ Ingestion pipeline setup failed (attempt {attempt + 1}), retrying in {delay}s: {e}")
+            time.sleep(delay)
+
+
+def _ingest_one(doc, payload):
+    """Ingest one document once; Bedrock and DynamoDB calls inside retry their own transient failures"""
+    # ingest_document reads doc_loc/doc_locs: pin each worker to its own document so
+    # concurrent calls never ingest (or move) the batch's files more than once
+    doc_payload = {**payload, "doc_loc": doc, "doc_locs": []}
+    try:
+        result = ingest_document(doc_payload)
+        return IngestResult(
+            document=doc,
+            status="success",
+            result=result.dict() if hasattr(result, "dict") else result,
+        )
+    except Exception as e:
+        return IngestResult(document=doc, status="error", error=str(e))
+
+
+def handle_batch_ingest(documents, project_name, payload):
+    """Handle batch ingestion of multiple documents (concurrently, results in input order)"""
+    try:
+        max_concurrency = int(payload.get("max_concurrency") or BATCH_INGEST_CONCURRENCY)
+    except (TypeError, ValueError):
+        max_concurrency = BATCH_INGEST_CONCURRENCY
+    workers = max(1, min(max_concurrency, BATCH_INGEST_MAX_CONCURRENCY, len(documents)))
+    logger.info(f"🚀 Batch ingesting {len(documents)} documents with {workers} workers")
+
+    _warm_pipeline_with_retry(payload)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch_ingest") as executor:
+        results = list(executor.map(lambda doc: _ingest_one(doc, payload), documents))
 
+    success_count = sum(1 for r in results if r.status == "success")
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "operation": "batch_ingest",
                 "total_documents": len(documents),
                 "results": results,
-                "success_count": sum(1 for r in results if r["status"] == "success"),
-                "error_count": sum(1 for r in results if r["status"] == "error"),
+                "success_count": success_count,
+                "error_count": len(results) - success_count,
             }
         ),
     }
@@ -86,7 +135,7 @@ def handle_batch_delete(documents, project_name):
     """Handle batch deletion of documents"""
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "operation": "batch_delete",
                 "message": f"Deleted {len(documents)} documents from {project_name}",
@@ -99,7 +148,7 @@ def handle_batch_analyze(documents, project_name):
     """Handle batch analysis of documents"""
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "operation": "batch_analyze",
                 "message": f"Analyzed {len(documents)} documents from {project_name}",
@@ -1,12 +1,34 @@
 # UI-related Lambda route handler for document deletion
 import os
 import boto3
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils.logger import CustomLogger
 from chat_history.chat_history import log_chat_history
+from utils.project_counts import adjust_document_count
 from Lambda.llm_lambda_test.lambda_handler import make_response
 logger = CustomLogger(__name__)
 s3 = boto3.client("s3")
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET")
+# S3 delete, vector cleanup, metadata cleanup and chat logging run side by side
+_delete_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="delete_document")
+# Lazily created clients, reused across warm invocations
+_vector_db = None
+_metadata_manager = None
+
+def _get_vector_db():
+    global _vector_db
+    if _vector_db is None:
+        from vector_db.vector_db import QdrantVectorDB
+        _vector_db = QdrantVectorDB()
+    return _vector_db
+
+def _get_metadata_manager():
+    global _metadata_manager
+    if _metadata_manager is None:
+        from utils.metadata import MetadataManager
+        _metadata_manager = MetadataManager()
+    return _metadata_manager
 
 def handle_delete_document(event, payload):
     """
@@ -26,35 +48,33 @@ def handle_delete_document(event, payload):
         if filename and not doc_key:
             doc_key = f"{os.getenv('DOCUMENTS_DATA_KEY', 'project-data/documents')}/{project_name}/{filename}"
         
-        # Delete from S3
-        try:
+        def _delete_s3():
+            # delete_object succeeds for missing keys, so HEAD first to only decrement real deletions
+            try:
+                s3.head_object(Bucket=DOCUMENTS_S3_BUCKET, Key=doc_key)
+                existed = True
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                    raise
+                existed = False
             s3.delete_object(Bucket=DOCUMENTS_S3_BUCKET, Key=doc_key)
-            logger.info(f"🗑️ Deleted from S3: {doc_key}")
-        except Exception as e:
-            logger.warning(f"Could not delete from S3: {e}")
-        
-        # Delete from vector database
-        try:
-            from vector_db.vector_db import QdrantVectorDB
-            vector_db = QdrantVectorDB()
+            logger.info("🗑️ Deleted from S3: %s", doc_key)
+            if existed:
+                adjust_document_count(project_name, -1)
+
+        def _delete_vectors():
+            vector_db = _get_vector_db()
             # This would need a delete method implemented
             # vector_db.delete_document(project_name, filename)
-            logger.info(f"🗑️ Deleted from vector DB: {filename}")
-        except Exception as e:
-            logger.warning(f"Could not delete from vector DB: {e}")
-        
-        # Clean up metadata
-        try:
-            from utils.metadata import MetadataManager
-            metadata_manager = MetadataManager()
+            logger.info("🗑️ Deleted from vector DB: %s", filename)
+
+        def _delete_metadata():
+            metadata_manager = _get_metadata_manager()
             # This would need a delete method implemented
             # metadata_manager.delete_document(project_name, filename)
-            logger.info(f"🗑️ Cleaned up metadata for: {filename}")
-        except Exception as e:
-            logger.warning(f"Could not clean up metadata: {e}")
-        
-        # Log to chat history
-        try:
+            logger.info("🗑️ Cleaned up metadata for: %s", filename)
+
+        def _log_chat():
             log_chat_history(
                 event=event, 
                 payload=payload, 
@@ -62,10 +82,22 @@ def handle_delete_document(event, payload):
                 content=f"🗑️ Document deleted: {filename or doc_key}",
                 metadata={"action": "document_deleted", "filename": filename}
             )
-        except Exception as e:
-            logger.warning(f"Could not log to chat history: {e}")
+
+        # Independent round trips: run them together so latency is the slowest one, not the sum
+        failure_messages = {
+            _delete_s3: "Could not delete from S3: %s",
+            _delete_vectors: "Could not delete from vector DB: %s",
+            _delete_metadata: "Could not clean up metadata: %s",
+            _log_chat: "Could not log to chat history: %s",
+        }
+        futures = {_delete_executor.submit(task): message for task, message in failure_messages.items()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(futures[future], e)
         
-        logger.info(f"✅ Document deletion completed: {filename}")
+        logger.info("✅ Document deletion completed: %s", filename)
         return make_response(200, {"message": f"Document deleted: {filename or doc_key}"})
         
     except Exception as e:
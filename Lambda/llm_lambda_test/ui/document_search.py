@@ -1,10 +1,41 @@
-import json
+import os
+import threading
+
 from utils.logger import CustomLogger
+from utils.json_utils import json_dumps
 
 # ======================================================
-# Logger
+# Logger / Env Vars
 # ======================================================
 logger = CustomLogger(__name__)
+DEFAULT_EMBEDDING_MODEL = os.getenv("DEFAULT_EMBEDDING_MODEL", "amazon.titan-embed-text-v2:0")
+BEDROCK_REGION = os.getenv("BEDROCK_REGION", "ap-south-1")
+CONTENT_PREVIEW_CHARS = 200
+# Results come back in Qdrant's order (similarity, or point id when browsing); nothing else is supported
+SUPPORTED_SORT_BY = ("relevance",)
+
+# ======================================================
+# Shared clients (reused across warm invocations)
+# ======================================================
+_search_clients = None
+_search_clients_lock = threading.Lock()
+
+def _get_search_clients():
+    """Lazily build the (ModelLoader, QdrantVectorDB) pair; ModelLoader.embed caches query vectors."""
+    global _search_clients
+    if _search_clients is None:
+        with _search_clients_lock:
+            if _search_clients is None:
+                from utils.model_loader import ModelLoader, BedrockProvider
+                from vector_db.vector_db import QdrantVectorDB
+                model_loader = ModelLoader()
+                model_loader.register(
+                    "bedrock",
+                    BedrockProvider(embedding_model=DEFAULT_EMBEDDING_MODEL, region=BEDROCK_REGION),
+                    model_name=DEFAULT_EMBEDDING_MODEL,
+                )
+                _search_clients = (model_loader, QdrantVectorDB())
+    return _search_clients
 
 
 # ======================================================
@@ -22,20 +53,33 @@ def handle_document_search(event, payload):
         sort_by = payload.get("sort_by", "relevance")
         limit = payload.get("limit", 20)
         offset = payload.get("offset", 0)
+        cursor = payload.get("cursor")
 
         if not project_name:
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": "project_name is required"}),
+                "body": json_dumps({"error": "project_name is required"}),
+            }
+        if sort_by not in SUPPORTED_SORT_BY:
+            return {
+                "statusCode": 400,
+                "body": json_dumps({"error": f"Unsupported sort_by '{sort_by}'; supported: {', '.join(SUPPORTED_SORT_BY)}"}),
+            }
+        browsing = not (search_query and search_query.strip())
+        if browsing and offset:
+            # Scroll pages by cursor; emulating offsets would re-read every earlier page
+            return {
+                "statusCode": 400,
+                "body": json_dumps({"error": "offset requires search_query; page with cursor instead"}),
             }
 
         search_results = perform_document_search(
-            project_name, search_query, filters, sort_by, limit, offset
+            project_name, search_query, filters, sort_by, limit, offset, cursor=cursor
         )
 
         return {
             "statusCode": 200,
-            "body": json.dumps(
+            "body": json_dumps(
                 {
                     "search_query": search_query,
                     "filters": filters,
@@ -45,6 +89,7 @@ def handle_document_search(event, payload):
                         "limit": limit,
                         "offset": offset,
                         "has_more": search_results["has_more"],
+                        "next_cursor": search_results["next_cursor"],
                     },
                 }
             ),
@@ -54,39 +99,50 @@ def handle_document_search(event, payload):
         logger.error(f"Error in document search: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({"error": str(e)}),
+            "body": json_dumps({"error": str(e)}),
         }
 
 
-def perform_document_search(project_name, search_query, filters, sort_by, limit, offset):
-    """Perform the actual document search (mock implementation)."""
-    mock_documents = [
-        {
-            "file_path": "document1.pdf",
-            "title": "Sample Document 1",
-            "content_preview": "This is a sample document about...",
-            "metadata": {
-                "upload_date": "2024-01-01",
-                "file_size": "2.5 MB",
-                "document_type": "PDF",
-            },
-            "relevance_score": 0.95,
-        },
-        {
-            "file_path": "document2.docx",
-            "title": "Sample Document 2",
-            "content_preview": "Another document containing...",
-            "metadata": {
-                "upload_date": "2024-01-02",
-                "file_size": "1.8 MB",
-                "document_type": "DOCX",
-            },
-            "relevance_score": 0.87,
-        },
-    ]
+def _to_document(hit):
+    """Shape a vector DB hit like the search API's document entries."""
+    payload = dict(hit.get("metadata") or {})
+    text = payload.pop("text", "") or ""
+    return {
+        "file_path": payload.get("filename"),
+        "title": payload.get("filename"),
+        "content_preview": text[:CONTENT_PREVIEW_CHARS],
+        "metadata": payload,
+        "relevance_score": hit.get("score"),
+    }
+
+
+def perform_document_search(project_name, search_query, filters, sort_by, limit, offset, cursor=None):
+    """
+    Search the project's chunks in Qdrant. Filters, limit and offset are pushed down to
+    Qdrant and the total comes from its count endpoint, so only one page is transferred.
+    Without a search_query the points are browsed with Qdrant's scroll cursor: pass the
+    returned next_cursor back as cursor (offset is not used). Only sort_by="relevance"
+    is supported; the handler rejects anything else.
+    """
+    limit = int(limit)
+    offset = int(offset)
+    model_loader, vector_db = _get_search_clients()
+    query_filter = vector_db.build_filter(project_name, filters)
 
+    if search_query and search_query.strip():
+        embedding_result = model_loader.embed(search_query.strip(), model_id=DEFAULT_EMBEDDING_MODEL)
+        query_vector = embedding_result[0] if isinstance(embedding_result, tuple) else embedding_result
+        hits = vector_db.search_page(query_vector, limit=limit, offset=offset, query_filter=query_filter)
+        next_cursor = None
+        total_count = vector_db.count(count_filter=query_filter, exact=False)
+        has_more = (offset + limit) < total_count
+    else:
+        hits, next_cursor = vector_db.scroll_page(limit=limit, cursor=cursor, scroll_filter=query_filter)
+        total_count = vector_db.count(count_filter=query_filter, exact=False)
+        has_more = next_cursor is not None
     return {
-        "documents": mock_documents[offset : offset + limit],
-        "total_count": len(mock_documents),
-        "has_more": (offset + limit) < len(mock_documents),
+        "documents": [_to_document(hit) for hit in hits],
+        "total_count": total_count,
+        "has_more": has_more,
+        "next_cursor": next_cursor,
     }
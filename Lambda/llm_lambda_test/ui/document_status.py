@@ -1,14 +1,18 @@
 # UI-related Lambda route handler for document status
 import os
+import heapq
 import datetime
 import boto3
 from utils.logger import CustomLogger
+from utils.ingestion_status import get_ingestion_status_store
 from chat_history.chat_history import log_chat_history
 from Lambda.llm_lambda_test.lambda_handler import make_response
 logger = CustomLogger(__name__)
 s3 = boto3.client("s3")
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET")
 TEMP_PREFIX = os.getenv("TEMP_DATA_KEY", "project-data/uploads/temp")
+# Most recent temp files returned in processing_files (total_processing still counts all of them)
+MAX_PROCESSING_FILES = int(os.getenv("MAX_PROCESSING_FILES", "100"))
 
 def handle_document_status(event, payload):
     """
@@ -30,34 +34,67 @@ def handle_document_status(event, payload):
             # This would need to be implemented in MetadataManager
             processed_docs = metadata_manager.list_project_documents(project_name)
         except Exception as e:
-            logger.warning(f"Could not fetch processed documents: {e}")
+            logger.warning("Could not fetch processed documents: %s", e)
         
         # Get temp files (still being processed)
         temp_files = []
-        try:
-            temp_prefix = f"{TEMP_PREFIX}/{project_name}/"
-            temp_response = s3.list_objects_v2(Bucket=DOCUMENTS_S3_BUCKET, Prefix=temp_prefix)
-            for obj in temp_response.get("Contents", []):
-                key = obj["Key"]
-                filename = key.split("/")[-1]
-                temp_files.append({
-                    "filename": filename,
-                    "key": key,
-                    "size": obj.get("Size", 0),
-                    "status": "processing",
-                    "last_modified": obj.get("LastModified", "")
-                })
-        except Exception as e:
-            logger.warning(f"Could not fetch temp files: {e}")
+        total_processing = 0
+        status_store = get_ingestion_status_store()
+        if status_store is not None:
+            # COUNT-only query on the status GSI (no item payloads) plus one bounded page of rows
+            try:
+                total_processing = status_store.count(project_name, "processing")
+                for row in status_store.list(project_name, "processing", limit=MAX_PROCESSING_FILES):
+                    temp_files.append({
+                        "filename": row.get("filename"),
+                        "key": row.get("s3_key"),
+                        "size": row.get("size", 0),
+                        "status": "processing",
+                        "last_modified": row.get("updated_at", "")
+                    })
+            except Exception as e:
+                logger.warning("Could not fetch ingestion status rows: %s", e)
+        else:
+            # Fallback (no INGESTION_STATUS_TABLE): list the temp prefix in S3
+            try:
+                temp_prefix = f"{TEMP_PREFIX}/{project_name}/"
+
+                def _iter_temp_objects():
+                    # list_objects_v2 stops at 1000 keys per call; the paginator follows continuation tokens
+                    nonlocal total_processing
+                    paginator = s3.get_paginator("list_objects_v2")
+                    for page in paginator.paginate(
+                        Bucket=DOCUMENTS_S3_BUCKET, Prefix=temp_prefix, PaginationConfig={"PageSize": 1000}
+                    ):
+                        for obj in page.get("Contents", []):
+                            total_processing += 1
+                            yield obj
+
+                # Bounded heap keeps only the newest N objects instead of buffering every listing
+                recent = heapq.nlargest(
+                    MAX_PROCESSING_FILES, _iter_temp_objects(), key=lambda obj: obj["LastModified"]
+                )
+                for obj in recent:
+                    key = obj["Key"]
+                    filename = key.split("/")[-1]
+                    temp_files.append({
+                        "filename": filename,
+                        "key": key,
+                        "size": obj.get("Size", 0),
+                        "status": "processing",
+                        "last_modified": obj.get("LastModified", "")
+                    })
+            except Exception as e:
+                logger.warning("Could not fetch temp files: %s", e)
         
         result = {
             "processed_documents": processed_docs,
             "processing_files": temp_files,
             "total_processed": len(processed_docs),
-            "total_processing": len(temp_files)
+            "total_processing": total_processing
         }
         
-        logger.info(f"✅ Document status retrieved for project: {project_name}")
+        logger.info("✅ Document status retrieved for project: %s", project_name)
         return make_response(200, result)
         
     except Exception as e:
@@ -1,6 +1,6 @@
-import json
 import boto3
 from utils.logger import CustomLogger
+from utils.json_utils import json_dumps
 
 # ======================================================
 # Logger / AWS Clients
@@ -25,7 +25,7 @@ def handle_export_data(event, payload):
         if not all([export_type, project_name]):
             return {
                 "statusCode": 400,
-                "body": json.dumps(
+                "body": json_dumps(
                     {"error": "export_type and project_name are required"}
                 ),
             }
@@ -39,12 +39,12 @@ def handle_export_data(event, payload):
         else:
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": "Invalid export_type"}),
+                "body": json_dumps({"error": "Invalid export_type"}),
             }
 
     except Exception as e:
         logger.error(f"Error in data export: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": str(e)})}
+        return {"statusCode": 500, "body": json_dumps({"error": str(e)})}
 
 
 # ======================================================
@@ -56,7 +56,7 @@ def export_project_data(project_name, export_format, payload):
 
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "export_type": "project",
                 "project_name": project_name,
@@ -75,7 +75,7 @@ def export_documents(project_name, export_format, payload):
 
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "export_type": "documents",
                 "project_name": project_name,
@@ -94,7 +94,7 @@ def export_analysis_results(project_name, export_format, payload):
 
     return {
         "statusCode": 200,
-        "body": json.dumps(
+        "body": json_dumps(
             {
                 "export_type": "analysis",
                 "project_name": project_name,
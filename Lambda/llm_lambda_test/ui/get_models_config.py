@@ -1,43 +1,106 @@
 # UI-related Lambda route handler for fetching models configuration
 import os
 import time
-import json
+import datetime
+import threading
 import boto3
 import yaml
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C parser
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 from utils.logger import CustomLogger
+from utils.json_utils import json_dumps, json_loads
 from Lambda.llm_lambda_test.lambda_handler import make_response
 logger = CustomLogger(__name__)
 s3 = boto3.client("s3")
-_MODELS_CACHE = {"ts": 0, "data": None, "etag": None}
+_MODELS_CACHE = {"ts": 0, "data": None, "etag": None, "size": 0, "filtered_json": None}
+# Top-level sections returned by /get_models_config
+_MODEL_SECTIONS = ("version", "embeddings", "rerankers", "llms")
 CACHE_TTL_SECONDS = int(os.getenv("MODELS_CONFIG_CACHE_TTL", "300"))  # 5 min default
 MODELS_CONFIG_BUCKET = os.getenv("MODELS_CONFIG_BUCKET") or os.getenv("CONFIG_BUCKET")
-MODELS_CONFIG_KEY = os.getenv("MODELS_CONFIG_KEY", "config/models.yaml")
+MODELS_CONFIG_KEY = os.getenv("MODELS_CONFIG_KEY", "config/models.yaml")  # a .json key is parsed as JSON
+# Past CACHE_TTL_SECONDS but within this age, the cached config is served and re-validated in the background
+STALE_TTL_SECONDS = int(os.getenv("MODELS_CONFIG_STALE_TTL", "3600"))
+_REFRESH_LOCK = threading.Lock()  # at most one background revalidation at a time
+# Below this body size a 304 saves nothing worth an If-None-Match; a plain GET is used and an
+# unchanged ETag still skips the parse
+CONDITIONAL_GET_MIN_BYTES = int(os.getenv("MODELS_CONFIG_CONDITIONAL_MIN_BYTES", str(16 * 1024)))
 
-def _load_models_config(force: bool = False):
-    """Internal helper to load and cache the models config from S3.
-    Returns raw dict loaded from YAML.
-    """
+def _parse_models_config(body: bytes):
+    """Parse the config object: orjson for a .json key, libyaml (when available) otherwise"""
+    if MODELS_CONFIG_KEY.lower().endswith(".json"):
+        return json_loads(body)
+    return yaml.load(body, Loader=_YamlLoader)
+
+def _fetch_models_config(force: bool = False):
+    """Conditional GET of the models config; updates _MODELS_CACHE and returns (data, refreshed)"""
     now = time.time()
-    if not force and _MODELS_CACHE["data"] and (now - _MODELS_CACHE["ts"]) < CACHE_TTL_SECONDS:
-        return _MODELS_CACHE["data"], False
-    if not MODELS_CONFIG_BUCKET:
-        raise RuntimeError("MODELS_CONFIG_BUCKET env var not set")
     extra = {}
-    if _MODELS_CACHE["etag"]:
+    if _MODELS_CACHE["etag"] and not force and _MODELS_CACHE["size"] >= CONDITIONAL_GET_MIN_BYTES:
         extra["IfNoneMatch"] = _MODELS_CACHE["etag"]
     try:
         # Try conditional get using ETag for minimal data transfer
-        response = s3.get_object(Bucket=MODELS_CONFIG_BUCKET, Key=MODELS_CONFIG_KEY, **({} if force else extra))
-        body = response["Body"].read().decode("utf-8")
-        data = yaml.safe_load(body) or {}
-        _MODELS_CACHE.update(ts=now, data=data, etag=response.get("ETag"))
-        return data, True
+        response = s3.get_object(Bucket=MODELS_CONFIG_BUCKET, Key=MODELS_CONFIG_KEY, **extra)
     except s3.exceptions.ClientError as e:  # type: ignore[attr-defined]
         code = e.response["Error"].get("Code")
         if code == "304":  # Not Modified
             _MODELS_CACHE["ts"] = now
             return _MODELS_CACHE["data"], False
         raise
+    etag = response.get("ETag")
+    if etag and etag == _MODELS_CACHE["etag"] and _MODELS_CACHE["data"] is not None:
+        # Unchanged object (forced reload or small-config plain GET): skip the parse
+        response["Body"].close()
+        _MODELS_CACHE["ts"] = now
+        return _MODELS_CACHE["data"], False
+    body = response["Body"].read()
+    data = _parse_models_config(body) or {}
+    # Section filter and its JSON computed once per ETag, not on every request
+    filtered_json = json_dumps({k: data[k] for k in _MODEL_SECTIONS if k in data})
+    _MODELS_CACHE.update(ts=now, data=data, etag=etag, size=len(body), filtered_json=filtered_json)
+    return data, True
+
+def _revalidate_in_background():
+    """Refresh the cache off the request path; no-op if a refresh is already running"""
+    if not _REFRESH_LOCK.acquire(blocking=False):
+        return
+    def _refresh():
+        try:
+            _fetch_models_config()
+        except Exception as e:
+            logger.warning(f"⚠️ Background models config refresh failed: {e}")
+        finally:
+            _REFRESH_LOCK.release()
+    threading.Thread(target=_refresh, name="models_config_refresh", daemon=True).start()
+
+def _load_models_config(force: bool = False):
+    """Internal helper to load and cache the models config from S3.
+    Returns raw dict loaded from YAML.
+    - fresh (< CACHE_TTL_SECONDS): served from cache, no S3 call
+    - stale (< STALE_TTL_SECONDS): served from cache, revalidated in the background
+    - otherwise (or force): conditional GET on the request path
+    """
+    age = time.time() - _MODELS_CACHE["ts"]
+    if not force and _MODELS_CACHE["data"]:
+        if age < CACHE_TTL_SECONDS:
+            return _MODELS_CACHE["data"], False
+        if age < STALE_TTL_SECONDS:
+            _revalidate_in_background()
+            return _MODELS_CACHE["data"], False
+    if not MODELS_CONFIG_BUCKET:
+        raise RuntimeError("MODELS_CONFIG_BUCKET env var not set")
+    return _fetch_models_config(force=force)
+
+def _warm_models_config():
+    """Load the config during container init so the first request is served from cache"""
+    if not MODELS_CONFIG_BUCKET or os.getenv("MODELS_CONFIG_PRELOAD", "true").lower() != "true":
+        return
+    try:
+        _fetch_models_config()
+        logger.info("🔥 Models config preloaded at init")
+    except Exception as e:
+        logger.warning(f"⚠️ Models config preload failed, will load on first request: {e}")
 
 def handle_get_models_config(event, payload):
     """Handles /get_models_config route:
@@ -55,12 +118,18 @@ def handle_get_models_config(event, payload):
             "cache_ttl": CACHE_TTL_SECONDS,
             "timestamp": int(time.time())
         }
-        # Flatten top-level version and group sections only
-        filtered = {
-            k: v for k, v in data.items() if k in ("version", "embeddings", "rerankers", "llms")
-        }
-        return make_response(200, {"models": filtered, "meta": meta})
+        # Flatten top-level version and group sections only (serialized once per ETag);
+        # only the small meta/timestamp part is encoded per request
+        filtered_json = _MODELS_CACHE["filtered_json"]
+        if filtered_json is None:
+            filtered_json = json_dumps({k: data[k] for k in _MODEL_SECTIONS if k in data})
+        body = (
+            f'{{"models":{filtered_json},"meta":{json_dumps(meta)},'
+            f'"timestamp":{json_dumps(datetime.datetime.utcnow().isoformat())}}}'
+        )
+        return make_response(200, body)
     except Exception as e:
         logger.error(f"\U0001F4A5 Error fetching models config: {e}", exc_info=True)
         return make_response(500, f"Error fetching models config: {str(e)}")
 
+_warm_models_config()
@@ -1,11 +1,12 @@
 # =====================================================
 # UI-related Lambda route handler for Upload button
 # =====================================================
-import json
 import os
-import boto3
+import time
+import uuid
+import functools
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional
 from pydantic import BaseModel, Field
 from botocore.exceptions import ClientError
 
@@ -15,6 +16,9 @@ try:
 except ImportError:
     import logging
     CustomLogger = logging.getLogger
+from utils.json_utils import json_dumps
+from utils.upload_records import get_upload_record_store
+from utils.connection_pool import connection_pool
 
 # =====================================================
 # MODELS
@@ -22,8 +26,9 @@ except ImportError:
 class GetPresignedUrlRequest(BaseModel):
     project_name: str = Field(..., min_length=1, max_length=100)
     file_name: str = Field(..., min_length=1, max_length=255)
-    file_content: Optional[str] = None  # base64-encoded file content
     content_type: Optional[str] = None
+    file_size: Optional[int] = Field(None, ge=1)  # bytes, recorded on the upload record
+    sha256: Optional[str] = Field(None, min_length=64, max_length=64)  # hex digest computed by the browser
     session_id: str = Field(..., min_length=1)
     user_id: str = Field(..., min_length=1, max_length=100)
 
@@ -31,28 +36,61 @@ class GetPresignedUrlRequest(BaseModel):
     embedding_provider: str
     embedding_model: str
 
-class GetPresignedUrlResponse(BaseModel):
-    """
-    OUTPUT MODEL – shaped like IngestionPayload
-    So the Upload button output can be used directly by the Ingestion button
-    """
-    session_id: str
-    project_name: str
-    user_id: str
-    doc_loc: str
-    doc_locs: List[str]
-    ingest_source: str
-    source_path: str
-    embedding_provider: str
-    embedding_model: str
+# OUTPUT – shaped like IngestionPayload, so the Upload button output can be used
+# directly by the Ingestion button:
+#   session_id, project_name, user_id, doc_loc, doc_locs, ingest_source,
+#   source_path, embedding_provider, embedding_model
+#   + upload: {url, fields} presigned POST the browser sends the file to
+#   + upload_id: key of the upload record, for upload status lookups
+# Built as a plain dict from already-validated values (no model pass on output).
 
 
 # =====================================================
 # CONFIG
 # =====================================================
 logger = CustomLogger(__name__)
-s3_client = boto3.client("s3")
+# Shared pooled client (keep-alive, adaptive retries), created at init so warm calls reuse its sockets
+s3_client = connection_pool.get_s3_client()
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET", "document-bot-bucket")
+PRESIGNED_POST_EXPIRY_S = int(os.environ.get("PRESIGNED_POST_EXPIRY_S", "900"))
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(30 * 1024 * 1024)))  # matches the UI limit
+# Built once per container: extension → content type, and the file name sanitizer
+_CONTENT_TYPE_MAP = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "doc": "application/msword",
+    "txt": "text/plain",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+_DEFAULT_CONTENT_TYPE = "application/octet-stream"
+_SANITIZE_TABLE = str.maketrans({" ": "_", "/": "_"})
+# Retried uploads of the same file within one slot reuse the signed POST policy. The slot is
+# clamped to a third of PRESIGNED_POST_EXPIRY_S, so a cached policy always has at least
+# two thirds of its validity left when handed out (0 disables reuse)
+PRESIGNED_CACHE_SLOT_S = min(
+    int(os.environ.get("PRESIGNED_CACHE_SLOT_S", "300")), PRESIGNED_POST_EXPIRY_S // 3
+)
+
+
+# =====================================================
+# HELPERS
+# =====================================================
+@functools.lru_cache(maxsize=1024)
+def _presigned_post(s3_key, fields_items, exp_slot):
+    """
+    Signed POST policy for s3_key with the given (name, value) fields, cached per exp_slot.
+    upload_timestamp is the time the policy was first signed, so cache hits return identical fields.
+    """
+    fields = dict(fields_items)
+    fields["x-amz-meta-upload_timestamp"] = datetime.utcnow().isoformat()
+    return s3_client.generate_presigned_post(
+        Bucket=DOCUMENTS_S3_BUCKET,
+        Key=s3_key,
+        Fields=fields,
+        Conditions=[{k: v} for k, v in fields.items()] + [["content-length-range", 1, MAX_UPLOAD_BYTES]],
+        ExpiresIn=PRESIGNED_POST_EXPIRY_S,
+    )
 
 
 # =====================================================
@@ -60,19 +98,22 @@ DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET", "document-bot-bucket
 # =====================================================
 def handle_get_presigned_url(event, payload):
     """
-    Upload file to S3 and return GetPresignedUrlResponse.
-    This is triggered by the Upload button.
+    Return a presigned POST for the file's temp key plus the ingestion-shaped upload response.
+    This is triggered by the Upload button; the browser then uploads the file straight to S3.
     """
     try:
         logger.info("📤 Upload handler started")
 
         # Validate payload
         try:
-            request_data = GetPresignedUrlRequest(**payload)
+            if hasattr(GetPresignedUrlRequest, "model_validate"):  # pydantic v2
+                request_data = GetPresignedUrlRequest.model_validate(payload)
+            else:
+                request_data = GetPresignedUrlRequest.parse_obj(payload)
         except Exception as e:
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": f"Invalid payload: {str(e)}", "success": False})
+                "body": json_dumps({"error": f"Invalid payload: {str(e)}", "success": False})
             }
 
         project_name = request_data.project_name
@@ -80,82 +121,87 @@ def handle_get_presigned_url(event, payload):
         content_type = request_data.content_type
         session_id = request_data.session_id
         user_id = request_data.user_id
-        file_content = request_data.file_content
 
         logger.info(f"🔐 Upload request - User={user_id}, Project={project_name}, File={file_name}")
 
         # Sanitize file name
-        safe_file_name = file_name.replace(" ", "_").replace("/", "_")
+        safe_file_name = file_name.translate(_SANITIZE_TABLE)
 
         # S3 key
         s3_key = f"project_data/uploads/temp/{project_name}/{safe_file_name}"
 
         # Content type detection
         if not content_type:
-            ext = safe_file_name.lower().split(".")[-1] if "." in safe_file_name else ""
-            content_type_map = {
-                "pdf": "application/pdf",
-                "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                "doc": "application/msword",
-                "txt": "text/plain",
-                "csv": "text/csv",
-                "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            }
-            content_type = content_type_map.get(ext, "application/octet-stream")
-
-        # Direct upload to S3
-        if not file_content:
-            return {
-                "statusCode": 400,
-                "body": json.dumps({"error": "file_content (base64) is required for upload", "success": False})
-            }
-
-        import base64
-        file_bytes = base64.b64decode(file_content)
-
-        s3_client.put_object(
-            Bucket=DOCUMENTS_S3_BUCKET,
-            Key=s3_key,
-            Body=file_bytes,
-            ContentType=content_type,
-            Metadata={
-                "project": project_name,
-                "original_name": file_name,
-                "user_id": user_id,
-                "session_id": session_id,
-                "upload_timestamp": datetime.utcnow().isoformat()
-            }
-        )
-
-        logger.info(f"✅ Uploaded to S3: s3://{DOCUMENTS_S3_BUCKET}/{s3_key}")
-
-        # Build ingestion-style response, but wrapped as GetPresignedUrlResponse
-        response = GetPresignedUrlResponse(
-            session_id=session_id,
-            project_name=project_name,
-            user_id=user_id,
-            doc_loc=f"{safe_file_name}",
-            doc_locs=[safe_file_name],
-            ingest_source="ui_upload",
-            source_path=s3_key,
-            embedding_provider=request_data.embedding_provider,
-            embedding_model=request_data.embedding_model,
-        )
+            _, dot, ext = safe_file_name.rpartition(".")
+            content_type = _CONTENT_TYPE_MAP.get(ext.lower() if dot else "", _DEFAULT_CONTENT_TYPE)
+
+        # Presigned POST: the file goes browser → S3, never through API Gateway/Lambda
+        metadata = {
+            "x-amz-meta-project": project_name,
+            "x-amz-meta-original_name": file_name,
+            "x-amz-meta-user_id": user_id,
+            "x-amz-meta-session_id": session_id,
+        }
+        if request_data.sha256:
+            # Hint only: ingestion prefetches the duplicate lookup, then confirms with the downloaded bytes' hash
+            metadata["x-amz-meta-sha256"] = request_data.sha256.lower()
+        fields_items = (("Content-Type", content_type), *metadata.items())
+        if PRESIGNED_CACHE_SLOT_S > 0:
+            presigned_post = _presigned_post(s3_key, fields_items, int(time.time() // PRESIGNED_CACHE_SLOT_S))
+        else:
+            presigned_post = _presigned_post.__wrapped__(s3_key, fields_items, None)
+
+        logger.info(f"✅ Presigned POST issued for s3://{DOCUMENTS_S3_BUCKET}/{s3_key}")
+
+        # Record the upload (same fields a HEAD would return) so upload status can Query it by upload_id
+        upload_id = uuid.uuid4().hex
+        upload_records = get_upload_record_store()
+        if upload_records is not None:
+            signed_fields = presigned_post["fields"]
+            recorded = upload_records.record(
+                upload_id,
+                project_name,
+                s3_key,
+                content_type,
+                {
+                    name[len("x-amz-meta-"):]: value
+                    for name, value in signed_fields.items()
+                    if name.startswith("x-amz-meta-")
+                },
+                size=request_data.file_size,
+            )
+            if not recorded:
+                logger.warning(f"⚠️ Could not record upload {upload_id} for {s3_key}")
+
+        # Build ingestion-style response
+        response = {
+            "session_id": session_id,
+            "project_name": project_name,
+            "user_id": user_id,
+            "doc_loc": safe_file_name,
+            "doc_locs": [safe_file_name],
+            "ingest_source": "ui_upload",
+            "source_path": s3_key,
+            "embedding_provider": request_data.embedding_provider,
+            "embedding_model": request_data.embedding_model,
+            "upload": {"url": presigned_post["url"], "fields": presigned_post["fields"]},
+            "upload_id": upload_id,
+        }
 
         return {
             "statusCode": 200,
-            "body": json.dumps(response.dict())
+            "body": json_dumps(response)
         }
 
     except ClientError as e:
         logger.error(f"S3 error: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({"success": False, "error": str(e)})
+            "body": json_dumps({"success": False, "error": str(e)})
         }
     except Exception as e:
         logger.error(f"Error in upload handler: {e}", exc_info=True)
         return {
             "statusCode": 500,
-            "body": json.dumps({"success": False, "error": str(e)})
+            "body": json_dumps({"success": False, "error": str(e)})
         }
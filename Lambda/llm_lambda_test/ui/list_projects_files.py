@@ -1,7 +1,6 @@
 # UI-related Lambda route handlers for llm_lambda_test
 import os
-import json
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from botocore.exceptions import ClientError
 # Import shared utilities
@@ -10,12 +9,96 @@ try:
 except ImportError:
     import logging
     CustomLogger = logging.getLogger
+from utils.connection_pool import connection_pool
 from Lambda.llm_lambda_test.lambda_handler import make_response
 logger = CustomLogger(__name__)
-s3_client = boto3.client('s3')
+# Shared pooled client (keep-alive, adaptive retries), created at init so warm calls reuse its sockets
+s3_client = connection_pool.get_s3_client()
 # Environment variables
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET", "document-bot-bucket")
 TEMP_PREFIX = os.getenv("TEMP_DATA_KEY", "project-data/uploads/temp")
+LIST_PAGE_MAX_KEYS = 1000  # ListObjectsV2 upper bound per call
+# Sub-prefixes (uploads/, documents/, ...) listed concurrently on the full-listing path
+LIST_FANOUT_WORKERS = int(os.getenv("LIST_FANOUT_WORKERS", "8"))
+
+def _file_info(obj, prefix_len, file_type_lc):
+    """File entry for one ListObjectsV2 object, or None for folder markers / other file types"""
+    file_key = obj["Key"]
+    file_name = file_key[prefix_len:]  # every listed key starts with the prefix
+    # Skip empty folder markers
+    if not file_name:
+        return None
+    _, dot, ext = file_name.rpartition(".")
+    ext = ext.lower() if dot else None
+    # Filter by file type if specified
+    if file_type_lc and ext != file_type_lc:
+        return None
+    return {
+        "file_name": file_name,
+        "file_key": file_key,
+        "size": obj["Size"],
+        "last_modified": obj["LastModified"],  # datetime; ISO-8601 via json_dumps
+        "file_type": ext or "unknown",
+        "url": f"s3://{DOCUMENTS_S3_BUCKET}/{file_key}",
+    }
+
+def _list_files_page(prefix, cursor, limit, file_type):
+    """
+    Cursor page in S3 key order: ListObjectsV2 with StartAfter=cursor, stopping as soon
+    as `limit` files matched, so only the objects up to the page end are read.
+    Returns (files, next_cursor); next_cursor is None on the last page.
+    """
+    params = {
+        "Bucket": DOCUMENTS_S3_BUCKET,
+        "Prefix": prefix,
+        "MaxKeys": min(LIST_PAGE_MAX_KEYS, max(limit, 100)),
+    }
+    if cursor:
+        params["StartAfter"] = cursor
+    prefix_len = len(prefix)
+    file_type_lc = file_type.lower() if file_type else None
+    files = []
+    while True:
+        response = s3_client.list_objects_v2(**params)
+        for obj in response.get("Contents", []):
+            file_info = _file_info(obj, prefix_len, file_type_lc)
+            if file_info is None:
+                continue
+            files.append(file_info)
+            if len(files) == limit:
+                return files, obj["Key"]
+        if not response.get("IsTruncated"):
+            return files, None
+        params["ContinuationToken"] = response["NextContinuationToken"]
+
+def _list_prefix_objects(prefix):
+    """Every object under prefix (sequential ListObjectsV2 pages)"""
+    paginator = s3_client.get_paginator("list_objects_v2")
+    objects = []
+    for page_data in paginator.paginate(
+        Bucket=DOCUMENTS_S3_BUCKET, Prefix=prefix, PaginationConfig={"PageSize": LIST_PAGE_MAX_KEYS}
+    ):
+        objects.extend(page_data.get("Contents", []))
+    return objects
+
+def _list_all_objects(prefix):
+    """
+    Every object under the project prefix. One delimited listing finds the direct objects and
+    the sub-prefixes, which are then walked concurrently so their page round-trips overlap.
+    """
+    paginator = s3_client.get_paginator("list_objects_v2")
+    objects, sub_prefixes = [], []
+    for page_data in paginator.paginate(Bucket=DOCUMENTS_S3_BUCKET, Prefix=prefix, Delimiter="/"):
+        objects.extend(page_data.get("Contents", []))
+        sub_prefixes.extend(p["Prefix"] for p in page_data.get("CommonPrefixes", []))
+    if len(sub_prefixes) == 1:
+        objects.extend(_list_prefix_objects(sub_prefixes[0]))
+    elif sub_prefixes:
+        workers = min(LIST_FANOUT_WORKERS, len(sub_prefixes))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="list_files") as executor:
+            for sub_objects in executor.map(_list_prefix_objects, sub_prefixes):
+                objects.extend(sub_objects)
+    return objects
 
 def handle_list_project_files(event, payload):
     """
@@ -25,8 +108,12 @@ def handle_list_project_files(event, payload):
         "project_name": "string",
         "page": int (optional),
         "limit": int (optional),
-        "file_type": "string" (optional)
+        "file_type": "string" (optional),
+        "cursor": "string" (optional)
     }
+    With "cursor" present (null/"" for the first page) files come back in key order,
+    one S3 page-walk per request, with pagination.next_cursor for the following page.
+    Without it, page/limit over all files sorted newest first (lists the whole prefix).
     """
     try:
         logger.info("📁 Starting list project files request")
@@ -39,37 +126,36 @@ def handle_list_project_files(event, payload):
         file_type = payload.get("file_type")
         # S3 prefix for the project
         prefix = f"project-data/{project_name}/"
-        # List objects from S3
-        paginator = s3_client.get_paginator('list_objects_v2')
-        page_iterator = paginator.paginate(
-            Bucket=DOCUMENTS_S3_BUCKET,
-            Prefix=prefix,
-            MaxItems=limit,
-            PageSize=100
-        )
+        if "cursor" in payload:
+            cursor = payload.get("cursor") or None
+            files, next_cursor = _list_files_page(prefix, cursor, limit, file_type)
+            logger.info(f"✅ Listed {len(files)} files for project {project_name} (cursor page)")
+            return make_response(200, {
+                "success": True,
+                "project_name": project_name,
+                "files": files,
+                "pagination": {
+                    "cursor": cursor,
+                    "next_cursor": next_cursor,
+                    "has_more": next_cursor is not None,
+                    "files_per_page": limit,
+                },
+                "summary": {
+                    "page_files": len(files),
+                    "page_size_bytes": sum(f["size"] for f in files),
+                },
+            })
+        # List objects from S3 (sub-prefixes in parallel)
+        prefix_len = len(prefix)
+        file_type_lc = file_type.lower() if file_type else None
         files = []
         total_size = 0
-        for page_data in page_iterator:
-            if 'Contents' in page_data:
-                for obj in page_data['Contents']:
-                    file_key = obj['Key']
-                    file_name = file_key.replace(prefix, '')
-                    # Skip empty folder markers
-                    if not file_name:
-                        continue
-                    # Filter by file type if specified
-                    if file_type and not file_name.lower().endswith(f".{file_type.lower()}"):
-                        continue
-                    file_info = {
-                        "file_name": file_name,
-                        "file_key": file_key,
-                        "size": obj['Size'],
-                        "last_modified": obj['LastModified'].isoformat(),
-                        "file_type": file_name.split('.')[-1].lower() if '.' in file_name else 'unknown',
-                        "url": f"s3://{DOCUMENTS_S3_BUCKET}/{file_key}"
-                    }
-                    files.append(file_info)
-                    total_size += obj['Size']
+        for obj in _list_all_objects(prefix):
+            file_info = _file_info(obj, prefix_len, file_type_lc)
+            if file_info is None:
+                continue
+            files.append(file_info)
+            total_size += obj['Size']
         # Sort files by last modified (newest first)
         files.sort(key=lambda x: x['last_modified'], reverse=True)
         # Apply pagination
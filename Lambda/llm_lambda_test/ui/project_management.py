@@ -1,9 +1,15 @@
 
-import json
-import boto3
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
+from utils.json_utils import json_dumps, json_loads
+from utils.connection_pool import connection_pool
+from utils.dynamodb import EnhancedDynamoDBClient
+from utils.s3_parallel import put_objects
+from utils.project_counts import DOCUMENT_COUNT_MARKER, initialise_document_count
 # Import shared utilities
 try:
     from utils.logger import CustomLogger
@@ -11,12 +17,22 @@ except ImportError:
     import logging
     CustomLogger = logging.getLogger
 logger = CustomLogger(__name__)
-# AWS clients
-s3_client = boto3.client('s3')
-dynamodb = boto3.resource('dynamodb')
+# AWS clients (shared pooled clients, created during container init)
+s3_client = connection_pool.get_s3_client()
+dynamodb = connection_pool.get_dynamodb_resource()
 # Environment variables
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET", "document-bot-bucket")
 PROJECTS_TABLE = os.environ.get("PROJECTS_TABLE", "document-bot-projects")
+# Stored documents live under {DOCUMENTS_DATA_KEY}/{project_name}/ (same default as delete_document)
+DOCUMENTS_DATA_KEY = os.environ.get("DOCUMENTS_DATA_KEY", "project-data/documents")
+# GSI on PROJECTS_TABLE: hash key status, range key created_at (newest first via ScanIndexForward=False)
+PROJECTS_STATUS_INDEX = os.environ.get("PROJECTS_STATUS_INDEX", "status-created_at-index")
+# Conditional project puts in flight during create_batch
+BULK_CREATE_WORKERS = 8
+_dynamo_client = None  # EnhancedDynamoDBClient for batched reads, created on first use
+# Warm-container cache of .project_info bodies: key → (ETag, parsed data), revalidated with IfNoneMatch
+PROJECT_INFO_CACHE_SIZE = 1024
+_PROJECT_INFO_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
 # Initialize DynamoDB table
 try:
     projects_table = dynamodb.Table(PROJECTS_TABLE)
@@ -29,8 +45,9 @@ def handle_project_management(event, payload):
     
     Expected payload:
     {
-        "action": "create|list|update|delete|get",
+        "action": "create|create_batch|list|update|delete|get",
         "project_name": "string" (for specific operations),
+        "projects": [{...create payload...}] (for create_batch),
         "description": "string" (for create/update),
         "project_type": "string" (optional),
         "metadata": {} (optional)
@@ -41,8 +58,8 @@ def handle_project_management(event, payload):
         if not action:
             return {
                 "statusCode": 400,
-                "body": json.dumps({
-                    "error": "action is required (create, list, update, delete, get)",
+                "body": json_dumps({
+                    "error": "action is required (create, create_batch, list, update, delete, get)",
                     "success": False
                 })
             }
@@ -51,6 +68,8 @@ def handle_project_management(event, payload):
         
         if action == "create":
             return create_project(payload)
+        elif action == "create_batch":
+            return create_projects_bulk(payload)
         elif action == "list":
             return list_projects(payload)
         elif action == "get":
@@ -62,10 +81,10 @@ def handle_project_management(event, payload):
         else:
             return {
                 "statusCode": 400,
-                "body": json.dumps({
+                "body": json_dumps({
                     "error": f"Unknown action: {action}",
                     "success": False,
-                    "available_actions": ["create", "list", "get", "update", "delete"]
+                    "available_actions": ["create", "create_batch", "list", "get", "update", "delete"]
                 })
             }
             
@@ -73,37 +92,41 @@ def handle_project_management(event, payload):
         logger.error(f"Error in project_management: {e}", exc_info=True)
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": str(e),
                 "success": False
             })
         }
+def _build_project_data(payload):
+    """Project record stored in .project_info and the projects table"""
+    project_name = payload["project_name"]
+    now = datetime.utcnow().isoformat()
+    return {
+        "project_id": project_name.replace(" ", "_").lower(),  # Sanitize project name
+        "project_name": project_name,
+        "description": payload.get("description", ""),
+        "project_type": payload.get("project_type", "general"),
+        "created_at": now,
+        "updated_at": now,
+        "status": "active",
+        "document_count": 0,
+        DOCUMENT_COUNT_MARKER: True,  # counter is maintained from creation, no S3 backfill needed
+        "metadata": payload.get("metadata", {})
+    }
 def create_project(payload):
     """Create a new project"""
     project_name = payload.get("project_name")
     if not project_name:
         return {
             "statusCode": 400,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": "project_name is required for create action",
                 "success": False
             })
         }
     
-    # Sanitize project name
-    safe_project_name = project_name.replace(" ", "_").lower()
-    
-    project_data = {
-        "project_id": safe_project_name,
-        "project_name": project_name,
-        "description": payload.get("description", ""),
-        "project_type": payload.get("project_type", "general"),
-        "created_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat(),
-        "status": "active",
-        "document_count": 0,
-        "metadata": payload.get("metadata", {})
-    }
+    project_data = _build_project_data(payload)
+    safe_project_name = project_data["project_id"]
     
     try:
         # Create S3 folder structure
@@ -111,7 +134,7 @@ def create_project(payload):
         s3_client.put_object(
             Bucket=DOCUMENTS_S3_BUCKET,
             Key=f"{s3_prefix}.project_info",
-            Body=json.dumps(project_data),
+            Body=json_dumps(project_data),
             ContentType='application/json'
         )
         
@@ -126,7 +149,7 @@ def create_project(payload):
         
         return {
             "statusCode": 201,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "message": "Project created successfully",
                 "project": project_data
@@ -137,12 +160,172 @@ def create_project(payload):
         if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
             return {
                 "statusCode": 409,
-                "body": json.dumps({
+                "body": json_dumps({
                     "error": "Project already exists",
                     "success": False
                 })
             }
         raise e
+def _existing_project_ids(project_ids):
+    """project_ids already in the projects table (pre-check only; the conditional put is the real guard)"""
+    global _dynamo_client
+    if _dynamo_client is None:
+        _dynamo_client = EnhancedDynamoDBClient()
+    items = _dynamo_client.batch_get_items(PROJECTS_TABLE, [{"project_id": pid} for pid in project_ids])
+    return {item["project_id"] for item in items}
+def _claim_project(project_data):
+    """Conditional put of one project row: 'created', 'exists', or the error message"""
+    try:
+        projects_table.put_item(Item=project_data, ConditionExpression='attribute_not_exists(project_id)')
+        return "created"
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return "exists"
+        return str(e)
+def create_projects_bulk(payload):
+    """
+    Create many projects in one call.
+    All names are validated up front. Table rows are claimed first with conditional puts
+    (BatchWriteItem cannot carry attribute_not_exists, so it could overwrite a project created
+    concurrently), then .project_info objects are written concurrently; a row whose object
+    could not be written is removed again.
+    """
+    entries = payload.get("projects")
+    if not isinstance(entries, list) or not entries:
+        return {
+            "statusCode": 400,
+            "body": json_dumps({
+                "error": "projects (non-empty list) is required for create_batch action",
+                "success": False
+            })
+        }
+    
+    invalid = [i for i, entry in enumerate(entries) if not isinstance(entry, dict) or not entry.get("project_name")]
+    if invalid:
+        return {
+            "statusCode": 400,
+            "body": json_dumps({
+                "error": "project_name is required for every project",
+                "invalid_indexes": invalid,
+                "success": False
+            })
+        }
+    
+    # One record per project_id (first occurrence wins)
+    projects = {}
+    for entry in entries:
+        project_data = _build_project_data(entry)
+        projects.setdefault(project_data["project_id"], project_data)
+    
+    conflicts = []
+    failed = []  # [{"project_id", "error"}]
+    if projects_table:
+        conflicts = sorted(_existing_project_ids(list(projects)) & projects.keys())
+        for project_id in conflicts:
+            del projects[project_id]
+        
+        # Claim rows concurrently; attribute_not_exists keeps concurrent creates from being overwritten
+        project_list = list(projects.values())
+        if project_list:
+            with ThreadPoolExecutor(max_workers=min(BULK_CREATE_WORKERS, len(project_list))) as executor:
+                outcomes = list(executor.map(_claim_project, project_list))
+        else:
+            outcomes = []
+        for project_data, outcome in zip(project_list, outcomes):
+            if outcome == "created":
+                continue
+            del projects[project_data["project_id"]]
+            if outcome == "exists":
+                conflicts.append(project_data["project_id"])
+            else:
+                failed.append({"project_id": project_data["project_id"], "error": outcome})
+    
+    # Create S3 folder structure (concurrent PUTs)
+    project_list = list(projects.values())
+    written = put_objects(s3_client, DOCUMENTS_S3_BUCKET, [
+        (f"project-data/{p['project_id']}/.project_info", json_dumps(p), 'application/json')
+        for p in project_list
+    ])
+    created = [p for p, ok in zip(project_list, written) if ok]
+    for project_data, ok in zip(project_list, written):
+        if ok:
+            continue
+        failed.append({"project_id": project_data["project_id"], "error": "Could not write .project_info to S3"})
+        if projects_table:
+            # Roll back the claimed row so the project can be created again
+            try:
+                projects_table.delete_item(Key={'project_id': project_data["project_id"]})
+            except ClientError as e:
+                logger.error(f"💥 Could not roll back project row {project_data['project_id']}: {e}")
+    
+    logger.info(f"✅ Created {len(created)} projects ({len(conflicts)} existing, {len(failed)} failed)")
+    
+    if failed:
+        status_code = 207 if created or conflicts else 500  # per-item errors, not a conflict
+    else:
+        status_code = 201 if created else 409
+    return {
+        "statusCode": status_code,
+        "body": json_dumps({
+            "success": bool(created),
+            "message": f"Created {len(created)} of {len(entries)} projects",
+            "projects": created,
+            "already_exists": sorted(conflicts),
+            "failed": failed
+        })
+    }
+def _get_project_info(key):
+    """
+    Fetch and parse a .project_info object, sending the cached ETag as IfNoneMatch.
+    A 304 reuses the cached parse; ClientErrors other than 304 (e.g. NoSuchKey) propagate.
+    """
+    cached = _PROJECT_INFO_CACHE.get(key)
+    try:
+        if cached:
+            obj = s3_client.get_object(Bucket=DOCUMENTS_S3_BUCKET, Key=key, IfNoneMatch=cached[0])
+        else:
+            obj = s3_client.get_object(Bucket=DOCUMENTS_S3_BUCKET, Key=key)
+    except ClientError as e:
+        if cached and e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+            _PROJECT_INFO_CACHE.move_to_end(key)
+            return dict(cached[1])
+        _PROJECT_INFO_CACHE.pop(key, None)
+        raise
+    
+    data = json_loads(obj['Body'].read())
+    _PROJECT_INFO_CACHE[key] = (obj['ETag'], data)
+    _PROJECT_INFO_CACHE.move_to_end(key)
+    while len(_PROJECT_INFO_CACHE) > PROJECT_INFO_CACHE_SIZE:
+        _PROJECT_INFO_CACHE.popitem(last=False)
+    return dict(data)  # callers add fields (document_count); keep the cached parse clean
+def _query_active_projects():
+    """
+    Active projects, newest first, from the status GSI (every page, so nothing is cut at 1 MB).
+    Falls back to a paginated, status-filtered Scan while the index does not exist yet
+    (see the projects table notes in main.tf for the index definition).
+    """
+    params = {
+        "IndexName": PROJECTS_STATUS_INDEX,
+        "KeyConditionExpression": Key('status').eq('active'),
+        "ScanIndexForward": False,
+    }
+    call, scanned = projects_table.query, False
+    try:
+        response = call(**params)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ValidationException':
+            raise
+        logger.warning(f"⚠️ {PROJECTS_STATUS_INDEX} unavailable on {PROJECTS_TABLE}, scanning instead: {e}")
+        params, call, scanned = {"FilterExpression": Attr('status').eq('active')}, projects_table.scan, True
+        response = call(**params)
+    items = response.get('Items', [])
+    while response.get('LastEvaluatedKey'):
+        params["ExclusiveStartKey"] = response['LastEvaluatedKey']
+        response = call(**params)
+        items.extend(response.get('Items', []))
+    if scanned:
+        items.sort(key=lambda item: item.get('created_at', ''), reverse=True)  # same order as the index
+    return items
 def list_projects(payload):
     """List all projects"""
     try:
@@ -150,8 +333,7 @@ def list_projects(payload):
         
         if projects_table:
             # Get from DynamoDB
-            response = projects_table.scan()
-            projects = response.get('Items', [])
+            projects = _query_active_projects()
         else:
             # Fallback: Get from S3
             paginator = s3_client.get_paginator('list_objects_v2')
@@ -168,12 +350,7 @@ def list_projects(payload):
                     
                     # Try to get project info
                     try:
-                        obj = s3_client.get_object(
-                            Bucket=DOCUMENTS_S3_BUCKET,
-                            Key=f"{project_folder}.project_info"
-                        )
-                        project_data = json.loads(obj['Body'].read())
-                        projects.append(project_data)
+                        projects.append(_get_project_info(f"{project_folder}.project_info"))
                     except:
                         # Create basic project info
                         projects.append({
@@ -185,18 +362,18 @@ def list_projects(payload):
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "projects": projects,
                 "total_count": len(projects)
-            }, default=str)
+            })
         }
         
     except Exception as e:
         logger.error(f"Error listing projects: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": "Failed to list projects",
                 "success": False
             })
@@ -207,7 +384,7 @@ def get_project(payload):
     if not project_name:
         return {
             "statusCode": 400,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": "project_name is required",
                 "success": False
             })
@@ -221,7 +398,7 @@ def get_project(payload):
             if 'Item' not in response:
                 return {
                     "statusCode": 404,
-                    "body": json.dumps({
+                    "body": json_dumps({
                         "error": "Project not found",
                         "success": False
                     })
@@ -229,29 +406,31 @@ def get_project(payload):
             project_data = response['Item']
         else:
             # Get from S3
-            obj = s3_client.get_object(
-                Bucket=DOCUMENTS_S3_BUCKET,
-                Key=f"project-data/{safe_project_name}/.project_info"
-            )
-            project_data = json.loads(obj['Body'].read())
+            project_data = _get_project_info(f"project-data/{safe_project_name}/.project_info")
         
-        # Get document count
-        file_count = get_project_file_count(safe_project_name)
-        project_data['document_count'] = file_count
+        # Get document count: the DynamoDB row carries an atomic counter (utils.project_counts);
+        # rows created before the counter existed (and the S3 fallback) list the project prefix
+        if not projects_table:
+            project_data['document_count'] = get_project_file_count(safe_project_name)
+        elif not project_data.get(DOCUMENT_COUNT_MARKER):
+            # Ingestion and deletion key documents by the project_name they were given
+            project_data['document_count'] = _backfill_document_count(
+                project_data.get('project_name', project_name)
+            )
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "project": project_data
-            }, default=str)
+            })
         }
         
     except ClientError as e:
         if e.response['Error']['Code'] == 'NoSuchKey':
             return {
                 "statusCode": 404,
-                "body": json.dumps({
+                "body": json_dumps({
                     "error": "Project not found",
                     "success": False
                 })
@@ -273,11 +452,32 @@ def get_project_file_count(project_id):
         return max(0, count - 1)  # Subtract 1 for .project_info file
     except:
         return 0
+def _count_project_documents(project_name):
+    """Count stored documents under the prefix ingestion and deletion count (raises on S3 errors)"""
+    paginator = s3_client.get_paginator('list_objects_v2')
+    page_iterator = paginator.paginate(
+        Bucket=DOCUMENTS_S3_BUCKET,
+        Prefix=f"{DOCUMENTS_DATA_KEY}/{project_name}/"
+    )
+    return sum(len(page.get('Contents', [])) for page in page_iterator)
+def _backfill_document_count(project_name):
+    """
+    Count an uninitialised project's documents once and store them as its counter.
+    A failed count is returned as 0 but not stored, so the next get_project retries.
+    """
+    try:
+        count = _count_project_documents(project_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not count documents for {project_name}: {e}")
+        return 0
+    if initialise_document_count(project_name, count):
+        logger.info(f"🔢 Backfilled document_count={count} for {project_name}")
+    return count
 def update_project(payload):
     """Update project (placeholder for now)"""
     return {
         "statusCode": 501,
-        "body": json.dumps({
+        "body": json_dumps({
             "error": "Update project not yet implemented",
             "success": False
         })
@@ -286,7 +486,7 @@ def delete_project(payload):
     """Delete project (placeholder for now)"""
     return {
         "statusCode": 501,
-        "body": json.dumps({
+        "body": json_dumps({
             "error": "Delete project not yet implemented", 
             "success": False
         })
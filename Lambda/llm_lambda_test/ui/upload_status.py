@@ -1,8 +1,11 @@
-import json
-import boto3
 import os
+import heapq
 from datetime import datetime
 from botocore.exceptions import ClientError
+from utils.json_utils import json_dumps
+from utils.connection_pool import connection_pool
+from utils.s3_parallel import head_objects
+from utils.upload_records import get_upload_record_store
 # Import shared utilities
 try:
     from utils.logger import CustomLogger
@@ -10,10 +13,11 @@ except ImportError:
     import logging
     CustomLogger = logging.getLogger
 logger = CustomLogger(__name__)
-# AWS clients
-s3_client = boto3.client('s3')
+# AWS clients (pooled: shared connections for the parallel HEAD fan-out)
+s3_client = connection_pool.get_s3_client()
 # Environment variables
 DOCUMENTS_S3_BUCKET = os.environ.get("DOCUMENTS_S3_BUCKET", "document-bot-bucket")
+RECENT_UPLOADS_LIMIT = 50
 def handle_upload_status(event, payload):
     """
     Handle upload status tracking
@@ -32,7 +36,7 @@ def handle_upload_status(event, payload):
         if not project_name:
             return {
                 "statusCode": 400,
-                "body": json.dumps({
+                "body": json_dumps({
                     "error": "project_name is required",
                     "success": False
                 })
@@ -55,7 +59,7 @@ def handle_upload_status(event, payload):
         logger.error(f"Error in upload_status: {e}", exc_info=True)
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": str(e),
                 "success": False
             })
@@ -63,48 +67,78 @@ def handle_upload_status(event, payload):
 def check_upload_by_id(project_name, upload_id):
     """Check upload status by upload ID"""
     try:
+        # Recorded uploads: one Query replaces listing the project prefix. Rows are written when the
+        # POST is signed, so each recorded key is HEADed and only objects that actually landed are reported.
+        # Uploads issued before the table existed fall through to S3
+        upload_records = get_upload_record_store()
+        records = upload_records.by_upload_id(upload_id) if upload_records is not None else []
+        if records:
+            head_responses = head_objects(s3_client, DOCUMENTS_S3_BUCKET, [record['s3_key'] for record in records])
+            matching_files = [
+                {
+                    "file_key": record['s3_key'],
+                    "file_name": record['filename'],
+                    "size": head_response['ContentLength'],
+                    "last_modified": head_response['LastModified'].isoformat(),
+                    "upload_status": "completed",
+                    "metadata": head_response.get('Metadata', {}),
+                    "content_type": head_response.get('ContentType', 'unknown')
+                }
+                for record, head_response in zip(records, head_responses)
+                if head_response is not None
+            ]
+            return {
+                "statusCode": 200,
+                "body": json_dumps({
+                    "success": True,
+                    "upload_id": upload_id,
+                    "project_name": project_name,
+                    "files": matching_files,
+                    "total_files": len(matching_files)
+                })
+            }
+        
         # List objects with upload_id in the key
         response = s3_client.list_objects_v2(
             Bucket=DOCUMENTS_S3_BUCKET,
             Prefix=f"project-data/{project_name}/uploads/",
         )
         
+        matching_objs = [obj for obj in response.get('Contents', []) if upload_id in obj['Key']]
+        # Get object metadata (HEADs run concurrently)
+        head_responses = head_objects(s3_client, DOCUMENTS_S3_BUCKET, [obj['Key'] for obj in matching_objs])
+        
         matching_files = []
-        for obj in response.get('Contents', []):
-            if upload_id in obj['Key']:
-                # Get object metadata
-                head_response = s3_client.head_object(
-                    Bucket=DOCUMENTS_S3_BUCKET,
-                    Key=obj['Key']
-                )
-                
-                file_status = {
-                    "file_key": obj['Key'],
-                    "file_name": obj['Key'].split('/')[-1],
-                    "size": obj['Size'],
-                    "last_modified": obj['LastModified'].isoformat(),
-                    "upload_status": "completed",
-                    "metadata": head_response.get('Metadata', {}),
-                    "content_type": head_response.get('ContentType', 'unknown')
-                }
-                matching_files.append(file_status)
+        for obj, head_response in zip(matching_objs, head_responses):
+            if head_response is None:
+                continue
+            file_status = {
+                "file_key": obj['Key'],
+                "file_name": obj['Key'].split('/')[-1],
+                "size": obj['Size'],
+                "last_modified": obj['LastModified'].isoformat(),
+                "upload_status": "completed",
+                "metadata": head_response.get('Metadata', {}),
+                "content_type": head_response.get('ContentType', 'unknown')
+            }
+            matching_files.append(file_status)
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "upload_id": upload_id,
                 "project_name": project_name,
                 "files": matching_files,
                 "total_files": len(matching_files)
-            }, default=str)
+            })
         }
         
     except ClientError as e:
         logger.error(f"S3 error in check_upload_by_id: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": "Failed to check upload status",
                 "success": False
             })
@@ -118,41 +152,40 @@ def check_upload_by_filename(project_name, file_name):
             Prefix=f"project-data/{project_name}/",
         )
         
+        matching_objs = [obj for obj in response.get('Contents', []) if file_name in obj['Key']]
+        head_responses = head_objects(s3_client, DOCUMENTS_S3_BUCKET, [obj['Key'] for obj in matching_objs])
+        
         matching_files = []
-        for obj in response.get('Contents', []):
-            if file_name in obj['Key']:
-                head_response = s3_client.head_object(
-                    Bucket=DOCUMENTS_S3_BUCKET,
-                    Key=obj['Key']
-                )
-                
-                file_status = {
-                    "file_key": obj['Key'],
-                    "file_name": obj['Key'].split('/')[-1],
-                    "size": obj['Size'],
-                    "last_modified": obj['LastModified'].isoformat(),
-                    "upload_status": "completed",
-                    "metadata": head_response.get('Metadata', {}),
-                    "ingestion_status": "pending"  # Would need to check actual ingestion status
-                }
-                matching_files.append(file_status)
+        for obj, head_response in zip(matching_objs, head_responses):
+            if head_response is None:
+                continue
+            file_status = {
+                "file_key": obj['Key'],
+                "file_name": obj['Key'].split('/')[-1],
+                "size": obj['Size'],
+                "last_modified": obj['LastModified'].isoformat(),
+                "upload_status": "completed",
+                "metadata": head_response.get('Metadata', {}),
+                "ingestion_status": "pending"  # Would need to check actual ingestion status
+            }
+            matching_files.append(file_status)
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "search_filename": file_name,
                 "project_name": project_name,
                 "files": matching_files,
                 "total_matches": len(matching_files)
-            }, default=str)
+            })
         }
         
     except Exception as e:
         logger.error(f"Error in check_upload_by_filename: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": str(e),
                 "success": False
             })
@@ -167,44 +200,37 @@ def get_project_upload_status(project_name):
             Prefix=f"project-data/{project_name}/uploads/"
         )
         
-        recent_uploads = []
+        # LIST only: sizes are summed over everything, but only the newest uploads are HEADed
         total_size = 0
-        
+        objs = []
         for page in page_iterator:
             for obj in page.get('Contents', []):
-                try:
-                    head_response = s3_client.head_object(
-                        Bucket=DOCUMENTS_S3_BUCKET,
-                        Key=obj['Key']
-                    )
-                    
-                    upload_info = {
-                        "file_key": obj['Key'],
-                        "file_name": obj['Key'].split('/')[-1],
-                        "size": obj['Size'],
-                        "size_mb": round(obj['Size'] / (1024 * 1024), 2),
-                        "last_modified": obj['LastModified'].isoformat(),
-                        "upload_status": "completed",
-                        "metadata": head_response.get('Metadata', {}),
-                        "content_type": head_response.get('ContentType', 'unknown')
-                    }
-                    
-                    recent_uploads.append(upload_info)
-                    total_size += obj['Size']
-                    
-                except ClientError:
-                    # Skip files we can't access
-                    continue
-        
-        # Sort by last modified (newest first)
-        recent_uploads.sort(key=lambda x: x['last_modified'], reverse=True)
-        
-        # Limit to most recent 50
-        recent_uploads = recent_uploads[:50]
+                objs.append(obj)
+                total_size += obj['Size']
+        
+        # Newest first, limited to the most recent RECENT_UPLOADS_LIMIT
+        objs = heapq.nlargest(RECENT_UPLOADS_LIMIT, objs, key=lambda obj: obj['LastModified'])
+        head_responses = head_objects(s3_client, DOCUMENTS_S3_BUCKET, [obj['Key'] for obj in objs])
+        
+        recent_uploads = []
+        for obj, head_response in zip(objs, head_responses):
+            if head_response is None:
+                # Skip files we can't access
+                continue
+            recent_uploads.append({
+                "file_key": obj['Key'],
+                "file_name": obj['Key'].split('/')[-1],
+                "size": obj['Size'],
+                "size_mb": round(obj['Size'] / (1024 * 1024), 2),
+                "last_modified": obj['LastModified'].isoformat(),
+                "upload_status": "completed",
+                "metadata": head_response.get('Metadata', {}),
+                "content_type": head_response.get('ContentType', 'unknown')
+            })
         
         return {
             "statusCode": 200,
-            "body": json.dumps({
+            "body": json_dumps({
                 "success": True,
                 "project_name": project_name,
                 "recent_uploads": recent_uploads,
@@ -214,14 +240,14 @@ def get_project_upload_status(project_name):
                     "total_size_mb": round(total_size / (1024 * 1024), 2),
                     "last_upload": recent_uploads[0]['last_modified'] if recent_uploads else None
                 }
-            }, default=str)
+            })
         }
         
     except Exception as e:
         logger.error(f"Error in get_project_upload_status: {e}")
         return {
             "statusCode": 500,
-            "body": json.dumps({
+            "body": json_dumps({
                 "error": str(e),
                 "success": False
             })
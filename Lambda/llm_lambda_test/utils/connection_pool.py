@@ -11,13 +11,25 @@ This reduces cold start times and improves performance by reusing:
 - Qdrant client connections
 - DynamoDB client connections  
 - Bedrock client connections
+- DAX (DynamoDB Accelerator) resource when DAX_ENDPOINT is configured
 """
 import os
 import boto3
 from typing import Optional, Dict, Any
 from qdrant_client import QdrantClient
+try:
+    import amazondax  # optional: only needed when a DAX cluster fronts DynamoDB
+except ImportError:
+    amazondax = None
 from utils.logger import CustomLogger
 logger = CustomLogger(__name__)
+# S3/DynamoDB pool size: per-file ingest workers share these clients across threads
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50"))
+# Client-side request validation on the shared S3 client; our call sites pass fixed, well-formed
+# parameters, so it is off by default and S3 itself rejects anything malformed
+S3_PARAMETER_VALIDATION = os.getenv("S3_PARAMETER_VALIDATION", "false").lower() == "true"
+# Qdrant hosts reached over plain host/port instead of the remote https URL
+_LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1"})
 class ConnectionPool:
     """Singleton connection pool for reusing expensive client connections"""
     
@@ -32,7 +44,10 @@ class ConnectionPool:
     def __init__(self):
         if not self._initialized:
             self._qdrant_client = None
+            self._qdrant_host = None
             self._dynamodb_resource = None
+            self._dax_resource = None
+            self._dax_checked = False
             self._bedrock_client = None
             self._s3_client = None
             ConnectionPool._initialized = True
@@ -49,7 +64,10 @@ class ConnectionPool:
             api_key = api_key or os.getenv("VECTOR_DB_API_KEY")
             
             try:
-                if host in ["localhost", "127.0.0.1"] or host.startswith("192.168."):
+                if not host:
+                    raise ValueError("VECTOR_DB_HOST is not set")
+                is_local = host in _LOCAL_HOSTS or host.startswith("192.168.")
+                if is_local:
                     self._qdrant_client = QdrantClient(host=host, port=port)
                     logger.info(f"🔗 Qdrant client connected to {host}:{port}")
                 else:
@@ -57,9 +75,11 @@ class ConnectionPool:
                         url=f"https://{host}:{port}",
                         api_key=api_key,
                         timeout=30,  # Increase timeout for remote connections
-                        prefer_grpc=False  # Use HTTP for better Lambda compatibility
+                        # HTTP by default for Lambda compatibility; VECTOR_DB_PREFER_GRPC=true opts into gRPC (port 6334)
+                        prefer_grpc=os.getenv("VECTOR_DB_PREFER_GRPC", "false").lower() == "true",
                     )
                     logger.info(f"🔗 Qdrant client connected to {host}:{port} (remote)")
+                self._qdrant_host = host
             except Exception as e:
                 logger.error(f"❌ Failed to create Qdrant client: {e}")
                 raise
@@ -74,7 +94,15 @@ class ConnectionPool:
         if self._dynamodb_resource is None:
             region = region_name or os.getenv("AWS_DEFAULT_REGION", "us-east-1")
             try:
-                self._dynamodb_resource = boto3.resource("dynamodb", region_name=region)
+                self._dynamodb_resource = boto3.resource(
+                    "dynamodb",
+                    region_name=region,
+                    config=boto3.session.Config(
+                        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                        retries={'max_attempts': 3, 'mode': 'adaptive'},
+                        tcp_keepalive=True
+                    )
+                )
                 logger.info(f"🔗 DynamoDB resource connected to {region}")
             except Exception as e:
                 logger.error(f"❌ Failed to create DynamoDB resource: {e}")
@@ -82,6 +110,31 @@ class ConnectionPool:
                 
         return self._dynamodb_resource
     
+    # ====================================================
+    # DAX Resource (optional)
+    # ====================================================
+    def get_dax_resource(self, endpoint: str = None) -> any:
+        """
+        Get or create a reusable DAX resource for cached item reads (GetItem/BatchGetItem).
+        Returns None when DAX_ENDPOINT is unset or amazondax is not installed.
+        """
+        if self._dax_resource is None and not self._dax_checked:
+            self._dax_checked = True
+            endpoint = endpoint or os.getenv("DAX_ENDPOINT")
+            if not endpoint:
+                return None
+            if amazondax is None:
+                logger.warning("⚠️ DAX_ENDPOINT set but amazondax is not installed; using DynamoDB directly")
+                return None
+            try:
+                self._dax_resource = amazondax.AmazonDaxClient.resource(endpoint_url=endpoint)
+                logger.info(f"🔗 DAX resource connected to {endpoint}")
+            except Exception as e:
+                logger.error(f"❌ Failed to create DAX resource, using DynamoDB directly: {e}")
+                self._dax_resource = None
+                
+        return self._dax_resource
+    
     # ====================================================
     # Bedrock Client  
     # ====================================================
@@ -117,7 +170,10 @@ class ConnectionPool:
                     "s3",
                     region_name=region,
                     config=boto3.session.Config(
-                        max_pool_connections=50
+                        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+                        retries={'max_attempts': 3, 'mode': 'adaptive'},
+                        tcp_keepalive=True,
+                        parameter_validation=S3_PARAMETER_VALIDATION
                     )
                 )
                 logger.info(f"🔗 S3 client connected to {region}")
@@ -130,11 +186,13 @@ class ConnectionPool:
     # ====================================================
     # Connection Status
     # ====================================================
-    def get_status(self) -> Dict[str, bool]:
+    def get_status(self) -> Dict[str, Any]:
         """Get connection pool status for debugging"""
         return {
             "qdrant_connected": self._qdrant_client is not None,
+            "qdrant_host": self._qdrant_host,
             "dynamodb_connected": self._dynamodb_resource is not None,
+            "dax_connected": self._dax_resource is not None,
             "bedrock_connected": self._bedrock_client is not None,
             "s3_connected": self._s3_client is not None,
         }
@@ -142,7 +200,10 @@ class ConnectionPool:
     def reset_connections(self):
         """Reset all connections (useful for testing)"""
         self._qdrant_client = None
+        self._qdrant_host = None
         self._dynamodb_resource = None
+        self._dax_resource = None
+        self._dax_checked = False
         self._bedrock_client = None
         self._s3_client = None
         logger.info("🔄 All connections reset")
@@ -1,11 +1,15 @@
 
 
+import time
 import boto3
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 from botocore.exceptions import ClientError
 from utils.logger import CustomLogger
 from utils.connection_pool import connection_pool
 logger = CustomLogger(__name__)
+# Validated Table resources, shared by every client instance for the life of the container;
+# keyed by (table_name, backend, region) so a DAX table is never handed to a non-DAX caller
+_TABLE_CACHE: Dict[tuple, Any] = {}
 
 # ======================================================
 # Enhanced DynamoDB Client
@@ -22,6 +26,9 @@ class EnhancedDynamoDBClient:
             # Use connection pool instead of creating new clients
             self.dynamodb = connection_pool.get_dynamodb_resource(region_name)
             self.client = self.dynamodb.meta.client  # Get client from resource
+            # Optional DAX cluster: only GetItem/BatchGetItem go through it. Its query cache is not
+            # invalidated by writes, so queries (duplicate checks) and all writes use DynamoDB directly
+            self.dax = connection_pool.get_dax_resource()
             logger.info("✅ DynamoDB client initialized with connection pooling")
         except Exception as e:
             logger.error(f"💥 Failed to initialize DynamoDB client: {e}")
@@ -29,12 +36,24 @@ class EnhancedDynamoDBClient:
     # --------------------------------------------------
     # Table Access
     # --------------------------------------------------
-    def get_table(self, table_name: str):
-        """Get a DynamoDB table resource with validation"""
+    def get_table(self, table_name: str, use_dax: bool = False):
+        """
+        Get a DynamoDB table resource with validation (DescribeTable runs once per table).
+        use_dax=True returns the DAX-backed table when a DAX cluster is configured;
+        only item reads (GetItem) should ask for it.
+        """
+        backend = "dax" if use_dax and self.dax is not None else "dynamodb"
+        cache_key = (table_name, backend, self.region_name)
+        table = _TABLE_CACHE.get(cache_key)
+        if table is not None:
+            return table
         try:
             table = self.dynamodb.Table(table_name)
-            table.load()  # Verify table exists
-            logger.debug(f"📋 Connected to table: {table_name}")
+            table.load()  # Verify table exists (DAX does not serve DescribeTable)
+            if backend == "dax":
+                table = self.dax.Table(table_name)
+            _TABLE_CACHE[cache_key] = table
+            logger.debug(f"📋 Connected to table: {table_name} ({backend})")
             return table
         except ClientError as e:
             if e.response["Error"]["Code"] == "ResourceNotFoundException":
@@ -72,6 +91,82 @@ class EnhancedDynamoDBClient:
             logger.error(f"💥 Unexpected error saving to {table_name}: {e}")
             return False
     # --------------------------------------------------
+    # Batch Put Items
+    # --------------------------------------------------
+    def batch_put_items(
+        self,
+        table_name: str,
+        items: List[Dict[str, Any]],
+        max_retries: int = 5,
+        backoff_base: float = 0.05,
+    ) -> bool:
+        """Put items with BatchWriteItem (25 per call), retrying UnprocessedItems with backoff"""
+        if not items:
+            return True
+        try:
+            for start in range(0, len(items), 25):
+                request_items = {
+                    table_name: [{"PutRequest": {"Item": item}} for item in items[start:start + 25]]
+                }
+                for attempt in range(max_retries + 1):
+                    response = self.dynamodb.batch_write_item(RequestItems=request_items)
+                    request_items = response.get("UnprocessedItems") or {}
+                    if not request_items:
+                        break
+                    if attempt >= max_retries:
+                        logger.error(
+                            f"💥 {len(request_items.get(table_name, []))} items still unprocessed in {table_name} "
+                            f"after {max_retries} retries"
+                        )
+                        return False
+                    time.sleep(backoff_base * (2 ** attempt))
+            logger.info(f"✅ Batch saved {len(items)} items to {table_name}")
+            return True
+        except ClientError as e:
+            logger.error(f"💥 Error batch saving items to {table_name}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"💥 Unexpected error batch saving to {table_name}: {e}")
+            return False
+    # --------------------------------------------------
+    # Batch Get Items
+    # --------------------------------------------------
+    def batch_get_items(
+        self,
+        table_name: str,
+        keys: List[Dict[str, Any]],
+        max_retries: int = 5,
+        backoff_base: float = 0.05,
+    ) -> List[Dict[str, Any]]:
+        """Get items with BatchGetItem (100 keys per call), retrying UnprocessedKeys with backoff"""
+        items: List[Dict[str, Any]] = []
+        if not keys:
+            return items
+        try:
+            for start in range(0, len(keys), 100):
+                request_items = {table_name: {"Keys": keys[start:start + 100]}}
+                for attempt in range(max_retries + 1):
+                    response = (self.dax or self.dynamodb).batch_get_item(RequestItems=request_items)
+                    items.extend(response.get("Responses", {}).get(table_name, []))
+                    request_items = response.get("UnprocessedKeys") or {}
+                    if not request_items:
+                        break
+                    if attempt >= max_retries:
+                        logger.warning(
+                            f"⚠️ {len(request_items[table_name]['Keys'])} keys still unprocessed in {table_name} "
+                            f"after {max_retries} retries"
+                        )
+                        break
+                    time.sleep(backoff_base * (2 ** attempt))
+            logger.debug(f"📖 Batch fetched {len(items)}/{len(keys)} items from {table_name}")
+            return items
+        except ClientError as e:
+            logger.error(f"💥 Error batch reading items from {table_name}: {e}")
+            return items
+        except Exception as e:
+            logger.error(f"💥 Unexpected error batch reading from {table_name}: {e}")
+            return items
+    # --------------------------------------------------
     # Get Item
     # --------------------------------------------------
     def get_item(
@@ -82,7 +177,7 @@ class EnhancedDynamoDBClient:
     ) -> Optional[Dict[str, Any]]:
         """Get an item from a DynamoDB table"""
         try:
-            table = self.get_table(table_name)
+            table = self.get_table(table_name, use_dax=True)
             response = table.get_item(Key=key, ConsistentRead=consistent_read)
             item = response.get("Item")
             if item:
@@ -178,26 +273,10 @@ class EnhancedDynamoDBClient:
         """Query items from a DynamoDB table - matches metadata.py call pattern"""
         try:
             table = self.get_table(table_name)
-            if isinstance(key_condition_expression, str):
-                query_params = {
-                    "KeyConditionExpression": key_condition_expression,
-                    "ScanIndexForward": scan_index_forward,
-                }
-            else:  # fallback for legacy usage
-                query_params = {
-                    "KeyConditionExpression": str(key_condition_expression),
-                    "ScanIndexForward": scan_index_forward,
-                }
-            if expression_attribute_values:
-                query_params["ExpressionAttributeValues"] = expression_attribute_values
-            if expression_attribute_names:
-                query_params["ExpressionAttributeNames"] = expression_attribute_names
-            if filter_expression:
-                query_params["FilterExpression"] = filter_expression
-            if index_name:
-                query_params["IndexName"] = index_name
-            if limit:
-                query_params["Limit"] = limit
+            query_params = self._build_query_params(
+                key_condition_expression, expression_attribute_values, expression_attribute_names,
+                filter_expression, index_name, limit, scan_index_forward,
+            )
             response = table.query(**query_params)
             items = response.get("Items", [])
             logger.info(f"✅ Query returned {len(items)} items from {table_name}")
@@ -208,6 +287,72 @@ class EnhancedDynamoDBClient:
         except Exception as e:
             logger.error(f"💥 Unexpected error querying {table_name}: {e}")
             return []
+    def iter_query_items(
+        self,
+        table_name: str,
+        key_condition_expression: str,
+        expression_attribute_values: Dict[str, Any] = None,
+        expression_attribute_names: Dict[str, str] = None,
+        filter_expression: str = None,
+        index_name: str = None,
+        page_size: int = None,
+        scan_index_forward: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every matching item, following LastEvaluatedKey across pages.
+        Only one page is held in memory at a time; errors are logged and re-raised, so a
+        failed query (e.g. a missing index) is never mistaken for an empty result.
+        """
+        try:
+            table = self.get_table(table_name)
+            query_params = self._build_query_params(
+                key_condition_expression, expression_attribute_values, expression_attribute_names,
+                filter_expression, index_name, page_size, scan_index_forward,
+            )
+            pages = 0
+            while True:
+                response = table.query(**query_params)
+                pages += 1
+                yield from response.get("Items", [])
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    break
+                query_params["ExclusiveStartKey"] = last_key
+            logger.info(f"✅ Paginated query read {pages} page(s) from {table_name}")
+        except ClientError as e:
+            logger.error(f"💥 Error querying {table_name}: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"💥 Unexpected error querying {table_name}: {e}")
+            raise
+    @staticmethod
+    def _build_query_params(
+        key_condition_expression,
+        expression_attribute_values: Dict[str, Any] = None,
+        expression_attribute_names: Dict[str, str] = None,
+        filter_expression: str = None,
+        index_name: str = None,
+        limit: int = None,
+        scan_index_forward: bool = True,
+    ) -> Dict[str, Any]:
+        """Build Table.query kwargs shared by query_items and iter_query_items"""
+        query_params = {
+            # str() is the fallback for legacy non-string usage
+            "KeyConditionExpression": key_condition_expression
+            if isinstance(key_condition_expression, str) else str(key_condition_expression),
+            "ScanIndexForward": scan_index_forward,
+        }
+        if expression_attribute_values:
+            query_params["ExpressionAttributeValues"] = expression_attribute_values
+        if expression_attribute_names:
+            query_params["ExpressionAttributeNames"] = expression_attribute_names
+        if filter_expression:
+            query_params["FilterExpression"] = filter_expression
+        if index_name:
+            query_params["IndexName"] = index_name
+        if limit:
+            query_params["Limit"] = limit
+        return query_params
     # --------------------------------------------------
     # Scan Items
     # --------------------------------------------------
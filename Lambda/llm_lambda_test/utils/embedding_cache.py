@@ -0,0 +1,125 @@
+# =====================================================
+# Embedding Cache
+# =====================================================
+"""
+Two-level cache of embeddings keyed by (model, sha256(text)):
+- LocalEmbeddingLRU: bounded in-process LRU, lives as long as the warm container
+- EmbeddingCache: DynamoDB table shared by all containers (needs EMBEDDING_CACHE_TABLE)
+Repeated boilerplate chunks and re-ingested documents skip the embedding provider.
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from boto3.dynamodb.types import Binary
+from utils.dynamodb import EnhancedDynamoDBClient
+from utils.logger import CustomLogger
+logger = CustomLogger(__name__)
+EMBEDDING_CACHE_TABLE = os.getenv("EMBEDDING_CACHE_TABLE")
+# ~4 KB per float32 vector (1024 dims) → 4096 entries ≈ 16 MB
+LOCAL_EMBEDDING_CACHE_SIZE = int(os.getenv("LOCAL_EMBEDDING_CACHE_SIZE", "4096"))
+
+def embedding_cache_key(model_id: str, text: str) -> str:
+    return f"{model_id}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+# ---------------------------
+# In-process LRU
+# ---------------------------
+class LocalEmbeddingLRU:
+    """
+    Thread-safe bounded LRU of float32 vectors.
+    Not functools.lru_cache: batch callers need lookup-without-compute to collect misses.
+    """
+    def __init__(self, maxsize: int = LOCAL_EMBEDDING_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is None:
+                return None
+            self._data.move_to_end(key)
+        return vector.tolist()
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        if self.maxsize <= 0:
+            return
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+local_embedding_cache = LocalEmbeddingLRU()
+
+# ---------------------------
+# DynamoDB cache
+# ---------------------------
+
+class EmbeddingCache:
+    """Vectors are stored as raw float32 bytes (4 KB for 1024 dims) under cache_key."""
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.dynamo_client = EnhancedDynamoDBClient()
+
+    @staticmethod
+    def cache_key(model_id: str, text: str) -> str:
+        return embedding_cache_key(model_id, text)
+
+    def get_many(self, model_id: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Return {cache_key: embedding} for the texts already cached"""
+        keys = list({self.cache_key(model_id, text) for text in texts})
+        return self.get_many_by_key(model_id, keys)
+
+    def get_many_by_key(self, model_id: str, keys: List[str]) -> Dict[str, List[float]]:
+        """Return {cache_key: embedding} for the given precomputed keys"""
+        items = self.dynamo_client.batch_get_items(self.table_name, [{"cache_key": k} for k in keys])
+        found: Dict[str, List[float]] = {}
+        for item in items:
+            raw = item.get("embedding")
+            if raw is None:
+                continue
+            raw = raw.value if isinstance(raw, Binary) else bytes(raw)
+            found[item["cache_key"]] = np.frombuffer(raw, dtype=np.float32).tolist()
+        logger.info(f"🗃️ Embedding cache hits={len(found)}/{len(keys)} (model={model_id})")
+        return found
+
+    def put_many(self, model_id: str, texts: List[str], embeddings: List[List[float]]) -> bool:
+        """Store freshly computed embeddings (best effort)"""
+        items = [
+            {
+                "cache_key": self.cache_key(model_id, text),
+                "model": model_id,
+                "embedding": Binary(np.asarray(embedding, dtype=np.float32).tobytes()),
+            }
+            for text, embedding in zip(texts, embeddings)
+        ]
+        # BatchWriteItem rejects duplicate keys in one request
+        unique_items = list({item["cache_key"]: item for item in items}.values())
+        return self.dynamo_client.batch_put_items(self.table_name, unique_items)
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Shared cache instance, or None when EMBEDDING_CACHE_TABLE is unset"""
+    global _embedding_cache
+    if _embedding_cache is None and EMBEDDING_CACHE_TABLE:
+        _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_TABLE)
+    return _embedding_cache
+
+__all__ = [
+    "EmbeddingCache",
+    "LocalEmbeddingLRU",
+    "embedding_cache_key",
+    "get_embedding_cache",
+    "local_embedding_cache",
+]
@@ -6,7 +6,7 @@ def split_into_chunks(text: str, chunk_size: int = 500) -> list[str]:
     return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
 
 
-from utils.model_loader import ModelLoader
+from utils.model_loader import ModelLoader, BedrockProvider, DEFAULT_EMBEDDING_MODEL
 
 # Initialize loader once
 _loader = ModelLoader()
@@ -19,13 +19,15 @@ def get_embedding_model():
     """
     global _embedding_model
     if _embedding_model is None:
-        _embedding_model = _loader.load_embedding_model()
+        _embedding_model = BedrockProvider(embedding_model=DEFAULT_EMBEDDING_MODEL)
+        _loader.register("bedrock", _embedding_model, model_name=DEFAULT_EMBEDDING_MODEL)
     return _embedding_model
 
 def get_embeddings(text: str, model_name: str = None) -> list[float]:
     """
-    Generate embeddings using Bedrock (ignores model_name for now).
-    Pipeline can still pass model_name, but it's ignored.
+    Generate embeddings using Bedrock.
+    Repeated texts are served from the ModelLoader's in-process embedding LRU.
     """
-    model = get_embedding_model()
-    return model.embed(text)
+    get_embedding_model()
+    embedding, _meta = _loader.embed(text, model_id=model_name or DEFAULT_EMBEDDING_MODEL)
+    return embedding
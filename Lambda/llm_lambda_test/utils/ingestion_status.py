@@ -0,0 +1,95 @@
+# =====================================================
+# Ingestion Status Table
+# =====================================================
+"""
+Per-file ingestion state kept in DynamoDB (needs INGESTION_STATUS_TABLE):
+- ingestion writes {project_name, s3_key, status="processing"} once the temp object is found
+- every file it touches then ends in a terminal status (TERMINAL_STATUSES)
+- document status counts "processing" rows through the project_name-status-index GSI
+  (Select=COUNT) instead of listing every temp object in S3
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from utils.dynamodb import EnhancedDynamoDBClient
+from utils.logger import CustomLogger
+logger = CustomLogger(__name__)
+INGESTION_STATUS_TABLE = os.getenv("INGESTION_STATUS_TABLE")
+INGESTION_STATUS_INDEX = os.getenv("INGESTION_STATUS_INDEX", "project_name-status-index")
+TERMINAL_STATUSES = frozenset({"completed", "duplicate", "unsupported", "failed"})
+
+class IngestionStatusStore:
+    """Rows keyed by (project_name, s3_key); status is the GSI range key."""
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.dynamo_client = EnhancedDynamoDBClient()
+
+    @staticmethod
+    def _row(project_name: str, s3_key: str, status: str, **extra) -> Dict[str, Any]:
+        return {
+            "project_name": project_name,
+            "s3_key": s3_key,
+            "filename": s3_key.rsplit("/", 1)[-1],
+            "status": status,
+            "updated_at": datetime.utcnow().isoformat(),
+            **{k: v for k, v in extra.items() if v is not None},
+        }
+
+    def mark_processing(self, project_name: str, s3_key: str, size: int = None) -> bool:
+        """Record a temp file that ingestion has found and started on (best effort)"""
+        return self.dynamo_client.batch_put_items(
+            self.table_name, [self._row(project_name, s3_key, "processing", size=size)]
+        )
+
+    def mark_finished(self, project_name: str, statuses: Dict[str, str]) -> bool:
+        """Write the terminal status of each temp file ({s3_key: status}) in one batched write (best effort)"""
+        unknown = set(statuses.values()) - TERMINAL_STATUSES
+        if unknown:
+            raise ValueError(f"Not terminal ingestion statuses: {sorted(unknown)}")
+        return self.dynamo_client.batch_put_items(
+            self.table_name, [self._row(project_name, key, status) for key, status in statuses.items()]
+        )
+
+    def count(self, project_name: str, status: str = "processing") -> int:
+        """COUNT-only GSI query: no items are returned, only the per-page Count"""
+        table = self.dynamo_client.get_table(self.table_name)
+        params = {
+            "IndexName": INGESTION_STATUS_INDEX,
+            "KeyConditionExpression": "project_name = :project_name AND #status = :status",
+            "ExpressionAttributeNames": {"#status": "status"},
+            "ExpressionAttributeValues": {":project_name": project_name, ":status": status},
+            "Select": "COUNT",
+        }
+        total = 0
+        while True:
+            response = table.query(**params)
+            total += response.get("Count", 0)
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return total
+            params["ExclusiveStartKey"] = last_key
+
+    def list(self, project_name: str, status: str = "processing", limit: int = 100) -> List[Dict[str, Any]]:
+        """First page (up to limit) of rows with the given status"""
+        return self.dynamo_client.query_items(
+            self.table_name,
+            key_condition_expression="project_name = :project_name AND #status = :status",
+            expression_attribute_names={"#status": "status"},
+            expression_attribute_values={":project_name": project_name, ":status": status},
+            index_name=INGESTION_STATUS_INDEX,
+            limit=limit,
+        )
+
+_ingestion_status_store: Optional[IngestionStatusStore] = None
+
+def get_ingestion_status_store() -> Optional[IngestionStatusStore]:
+    """Shared store instance, or None when INGESTION_STATUS_TABLE is unset"""
+    global _ingestion_status_store
+    if _ingestion_status_store is None and INGESTION_STATUS_TABLE:
+        _ingestion_status_store = IngestionStatusStore(INGESTION_STATUS_TABLE)
+    return _ingestion_status_store
+
+__all__ = [
+    "IngestionStatusStore",
+    "get_ingestion_status_store",
+]
@@ -0,0 +1,52 @@
+
+# =====================================================
+# Fast JSON helpers
+# =====================================================
+"""
+JSON encode/decode used on Lambda response paths.
+Uses orjson (Rust) when installed and falls back to the stdlib json module.
+datetimes are emitted as ISO-8601 (naive values are treated as UTC, matching datetime.utcnow()),
+DynamoDB Decimals as int/float, numpy arrays natively (orjson), anything else stringified.
+"""
+import json
+import dataclasses
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+)
+
+def _default(obj: Any) -> Any:
+    """DynamoDB Decimals as numbers (int when integral), anything else stringified"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+def _stdlib_default(obj: Any) -> Any:
+    """Dataclasses as dicts and datetimes as ISO-8601 (orjson does both natively), then _default"""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        # Shallow: json calls back here for nested values, and asdict() would deep-copy them
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    if isinstance(obj, datetime):
+        return (obj if obj.tzinfo else obj.replace(tzinfo=timezone.utc)).isoformat()
+    return _default(obj)
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to a JSON string"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+    return json.dumps(obj, default=_stdlib_default)
+
+def json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+__all__ = ["json_dumps", "json_loads"]
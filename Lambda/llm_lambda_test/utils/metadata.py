@@ -13,6 +13,9 @@ This module provides a clean, simplified approach to metadata operations:
 import hashlib
 import uuid
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
@@ -82,6 +85,70 @@ def build_metadata(
         file_size=file_size,
     )
 
+# ---------------------------
+# Content-hash lookup cache
+# ---------------------------
+# Only positive lookups are cached, and only for LOOKUP_CACHE_TTL_S: a miss must hit DynamoDB
+# every time so documents written by other containers are seen, and a failed query is never
+# remembered as "not a duplicate". Cleared by MetadataManager on every write.
+LOOKUP_CACHE_TTL_S = float(os.getenv("METADATA_LOOKUP_CACHE_TTL_S", "300"))
+LOOKUP_CACHE_SIZE = 10_000
+_LOOKUP_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # (index, table, value) → (expires_at, items)
+_lookup_lock = threading.Lock()
+_lookup_client: Optional[EnhancedDynamoDBClient] = None
+
+def _query_index(table_name: str, index_name: str, attribute: str, value: str) -> Tuple[dict, ...]:
+    """All items with attribute == value on a GSI; DynamoDB errors propagate to the caller."""
+    global _lookup_client
+    if _lookup_client is None:
+        _lookup_client = EnhancedDynamoDBClient()
+    table = _lookup_client.get_table(table_name)
+    params = {
+        "IndexName": index_name,
+        "KeyConditionExpression": f"{attribute} = :value",
+        "ExpressionAttributeValues": {":value": value},
+    }
+    items: List[dict] = []
+    while True:
+        response = table.query(**params)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return tuple(items)
+        params["ExclusiveStartKey"] = last_key
+
+def _cached_index_lookup(table_name: str, index_name: str, attribute: str, value: str) -> Tuple[dict, ...]:
+    key = (index_name, table_name, value)
+    now = time.monotonic()
+    with _lookup_lock:
+        entry = _LOOKUP_CACHE.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _LOOKUP_CACHE.move_to_end(key)
+                return entry[1]
+            del _LOOKUP_CACHE[key]
+    items = _query_index(table_name, index_name, attribute, value)
+    if items:
+        with _lookup_lock:
+            _LOOKUP_CACHE[key] = (now + LOOKUP_CACHE_TTL_S, items)
+            _LOOKUP_CACHE.move_to_end(key)
+            while len(_LOOKUP_CACHE) > LOOKUP_CACHE_SIZE:
+                _LOOKUP_CACHE.popitem(last=False)
+    return items
+
+def _cached_hash_lookup(table_name: str, content_hash: str) -> Tuple[dict, ...]:
+    """Query the content_hash GSI, reusing a recent positive result for the same (table, hash)."""
+    return _cached_index_lookup(table_name, "content_hash-index", "content_hash", content_hash)
+
+def _cached_etag_lookup(table_name: str, etag: str) -> Tuple[dict, ...]:
+    """Query the etag GSI; cached and cleared together with the hash lookups."""
+    return _cached_index_lookup(table_name, "etag-index", "etag", etag)
+
+def clear_hash_lookup_cache() -> None:
+    """Drop all cached content_hash / etag lookups (call after any metadata write)."""
+    with _lookup_lock:
+        _LOOKUP_CACHE.clear()
+
 # ---------------------------
 # MetadataManager Class - Only Basic Operations
 # ---------------------------
@@ -114,6 +181,7 @@ class MetadataManager:
         
         try:
             success = self.dynamo_client.put_item(self.ddb_table, metadata)
+            clear_hash_lookup_cache()
             if success:
                 logger.info(f"✅ Metadata saved successfully for document_id={metadata.get('document_id')}")
             else:
@@ -122,6 +190,23 @@ class MetadataManager:
         except Exception as e:
             logger.error(f"❌ Error saving metadata: {str(e)}", exc_info=True)
             return False
+    def save_metadata_batch(self, items: List[dict]) -> bool:
+        """Save multiple metadata records to DynamoDB with BatchWriteItem"""
+        logger.info(f"💾 Batch saving {len(items)} metadata records to table={self.ddb_table}")
+        
+        try:
+            # BatchWriteItem rejects duplicate keys in one request; keep the latest record per document_id
+            unique_items = list({item["document_id"]: item for item in items}.values())
+            success = self.dynamo_client.batch_put_items(self.ddb_table, unique_items)
+            clear_hash_lookup_cache()
+            if success:
+                logger.info(f"✅ Batch saved {len(items)} metadata records")
+            else:
+                logger.error(f"❌ Failed to batch save metadata records")
+            return success
+        except Exception as e:
+            logger.error(f"❌ Error batch saving metadata: {str(e)}", exc_info=True)
+            return False
     def get_metadata(self, document_id: str) -> Optional[dict]:
         """Retrieve metadata from DynamoDB by document_id"""
         logger.debug(f"📖 Retrieving metadata for document_id={document_id} from table={self.ddb_table}")
@@ -151,6 +236,7 @@ class MetadataManager:
                     ":timestamp": datetime.utcnow().isoformat()
                 }
             )
+            clear_hash_lookup_cache()
             
             if success:
                 logger.info(f"✅ Status updated to '{new_status}' for document_id={document_id}")
@@ -166,6 +252,7 @@ class MetadataManager:
         
         try:
             success = self.dynamo_client.delete_item(self.ddb_table, {"document_id": document_id})
+            clear_hash_lookup_cache()
             if success:
                 logger.info(f"✅ Metadata deleted successfully for document_id={document_id}")
             else:
@@ -215,12 +302,8 @@ class MetadataManager:
         logger.debug(f"🔍 Checking metadata existence for content_hash={content_hash[:12]}...")
         
         try:
-            items = self.dynamo_client.query_items(
-                table_name=self.ddb_table,
-                index_name="content_hash-index",
-                key_condition_expression="content_hash = :hash",
-                expression_attribute_values={":hash": content_hash}
-            )
+            # A recent positive lookup for this hash is served from the in-process cache
+            items = _cached_hash_lookup(self.ddb_table, content_hash)
             any_exists = bool(items)
             exact_exists = False
             embeddings_verified = False
@@ -259,6 +342,36 @@ class MetadataManager:
         except Exception as e:
             logger.error(f"❌ Error querying DynamoDB for content_hash={content_hash}: {str(e)}", exc_info=True)
             raise CustomException(f"Error checking metadata: {str(e)}")
+    def prefetch_hash_lookup(self, content_hash: str) -> None:
+        """
+        Warm the content_hash lookup for a hash that is only a hint (e.g. client-supplied).
+        Never decides anything itself; failures are ignored and the real check queries again.
+        """
+        try:
+            _cached_hash_lookup(self.ddb_table, content_hash)
+        except Exception as e:
+            logger.debug(f"Hash lookup prefetch failed for content_hash={content_hash[:12]}: {e}")
+    def check_etag_exists(self, etag: str, embedding_model: str) -> bool:
+        """
+        Pre-download duplicate check on the S3 ETag (MD5 of single-part uploads).
+        Returns True only when a record with the same embedding_model exists and its embeddings are in the vector DB.
+        Any lookup failure returns False so the caller falls back to the content_hash check.
+        """
+        logger.debug(f"🔍 Checking metadata existence for etag={etag}")
+        
+        try:
+            items = _cached_etag_lookup(self.ddb_table, etag)
+            for item in items:
+                if item.get("embedding_model") != embedding_model:
+                    continue
+                document_id = item.get("document_id")
+                if document_id and self.check_embeddings_exist(document_id):
+                    logger.info(f"✅ ETag match with verified embeddings → document_id={document_id}")
+                    return True
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ ETag lookup failed for etag={etag}, falling back to content hash: {str(e)}")
+            return False
     def find_documents_by_project(self, project_name: str, user_id: str) -> List[dict]:
         """Find all documents for a specific project and user using scan (assuming no project-user GSI)"""
         logger.debug(f"🔍 Finding documents for project={project_name}, user={user_id}")
@@ -9,7 +9,11 @@ import boto3
 import logging
 from typing import Any, Dict, List, Optional, Protocol
 import time  # added for retry backoff
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from utils.connection_pool import connection_pool
+from utils.embedding_cache import embedding_cache_key, get_embedding_cache, local_embedding_cache
 # =============================================================================
 # Configuration
 # =============================================================================
@@ -17,6 +21,18 @@ DEFAULT_EMBEDDING_MODEL = os.getenv("DEFAULT_EMBEDDING_MODEL", "amazon.titan-emb
 DEFAULT_LLM_MODEL = os.getenv("DEFAULT_LLM_MODEL", "anthropic.claude-3-sonnet-20240229-v1:0")
 DEFAULT_RERANK_MODEL = os.getenv("DEFAULT_RERANK_MODEL", "cohere.rerank-v1")
 BEDROCK_REGION_DEFAULT = os.getenv("BEDROCK_REGION", "ap-south-1")
+# Titan has no batch embedding endpoint, so batches fan out over a bounded thread pool
+EMBED_BATCH_WORKERS = int(os.getenv("EMBED_BATCH_WORKERS", "16"))
+# Cohere embed models on Bedrock accept up to 96 texts (2048 chars each) per InvokeModel
+COHERE_EMBED_MAX_BATCH = 96
+COHERE_EMBED_MAX_CHARS = 2048
+# In-flight multi-text embedding requests per document; start jitter spreads them to avoid 429 bursts
+EMBED_BATCH_CONCURRENCY = int(os.getenv("EMBED_BATCH_CONCURRENCY", "5"))
+EMBED_BATCH_JITTER_S = 0.05
+# In-flight InvokeModel calls per container, shared by every loader and thread: batch ingestion
+# nests document, file and embedding pools, so the per-pool limits alone multiply into hundreds of calls
+BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "32"))
+_bedrock_slots = threading.BoundedSemaphore(BEDROCK_MAX_CONCURRENCY)
 # Cost configuration (replace with real pricing as needed)
 MODEL_COSTS: Dict[str, Dict[str, float]] = {
     "amazon.titan-embed-text-v2:0": {"per_1k_tokens_in": 0.0001},
@@ -49,6 +65,9 @@ def calculate_cost(model_id: str, usage: Dict[str, int]) -> float:
     if "documents" in usage and "per_document" in cfg:
         cost += usage["documents"] * cfg["per_document"]
     return round(cost, 8)
+def _cached_embed_meta(model_id: str) -> Dict[str, Any]:
+    """Meta for an embedding served from cache (no provider call, no cost)"""
+    return {"model": model_id, "usage": {"tokens_in": 0, "tokens_out": 0, "chars": 0}, "cost": 0.0, "cached": True}
 # =============================================================================
 # Exceptions
 # =============================================================================
@@ -66,6 +85,9 @@ class RerankError(ProviderError):
 class Provider(Protocol):
     """All providers must implement these methods."""
     def embed(self, text: str, **kwargs) -> tuple[List[float], Dict[str, Any]]: ...
+    def embed_batch(
+        self, texts: List[str], **kwargs
+    ) -> tuple[List[List[float]], List[Dict[str, Any]]]: ...
     def generate(
         self, prompt: str, max_tokens: int = 512, temperature: float = 0.7, **kwargs
     ) -> tuple[str, Dict[str, Any]]: ...
@@ -122,13 +144,14 @@ class BedrockProvider:
         """Unified invoke with simple retry/backoff."""
         for attempt in range(self._max_retries + 1):
             try:
-                resp = self._ensure_client().invoke_model(
-                    modelId=model_id,
-                    body=json.dumps(payload),
-                    accept="application/json",
-                    contentType="application/json",
-                )
-                return json.loads(resp["body"].read())
+                with _bedrock_slots:  # released before any backoff sleep
+                    resp = self._ensure_client().invoke_model(
+                        modelId=model_id,
+                        body=json.dumps(payload),
+                        accept="application/json",
+                        contentType="application/json",
+                    )
+                    return json.loads(resp["body"].read())
             except Exception as e:
                 if attempt >= self._max_retries:
                     self._log(logging.ERROR, f"{op} invoke failed", model=model_id, error=str(e), attempt=attempt)
@@ -162,6 +185,75 @@ class BedrockProvider:
         except Exception as e:
             self._log(logging.ERROR, "Embedding failed", model=model_id, error=str(e))
             raise EmbeddingError(f"Embedding failed (model={model_id}): {e}") from e
+    def embed_batch(
+        self,
+        texts: List[str],
+        model_id: Optional[str] = None,
+        max_length: int = 8000,
+        max_workers: int = EMBED_BATCH_WORKERS,
+    ) -> tuple[List[List[float]], List[Dict[str, Any]]]:
+        """
+        Embed many texts: Cohere models take up to 96 texts per InvokeModel,
+        other models get one InvokeModel per text on a bounded thread pool.
+        Returns embeddings and per-text meta in input order; raises on the first failure.
+        """
+        if not texts:
+            return [], []
+        model_id = model_id or self.embedding_model
+        self._ensure_client()  # create the pooled client once, before the workers start
+        if model_id.startswith("cohere.embed"):
+            sub_batches = [
+                texts[start:start + COHERE_EMBED_MAX_BATCH]
+                for start in range(0, len(texts), COHERE_EMBED_MAX_BATCH)
+            ]
+            def _run(batch: List[str]):
+                if len(sub_batches) > 1:
+                    time.sleep(random.uniform(0, EMBED_BATCH_JITTER_S))
+                return self._embed_cohere_batch(batch, model_id, max_length)
+            workers = max(1, min(EMBED_BATCH_CONCURRENCY, len(sub_batches)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                batch_results = list(executor.map(_run, sub_batches))  # map keeps sub-batch order
+            embeddings: List[List[float]] = []
+            metas: List[Dict[str, Any]] = []
+            for batch_embeddings, batch_metas in batch_results:
+                embeddings.extend(batch_embeddings)
+                metas.extend(batch_metas)
+            return embeddings, metas
+        workers = max(1, min(max_workers, len(texts)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda text: self.embed(text, model_id=model_id, max_length=max_length), texts
+            ))
+        embeddings = [embedding for embedding, _meta in results]
+        metas = [meta for _embedding, meta in results]
+        return embeddings, metas
+    def _embed_cohere_batch(
+        self, texts: List[str], model_id: str, max_length: int
+    ) -> tuple[List[List[float]], List[Dict[str, Any]]]:
+        """One InvokeModel for up to COHERE_EMBED_MAX_BATCH texts (order preserved)."""
+        if any(not isinstance(text, str) or not text.strip() for text in texts):
+            raise EmbeddingError("Text must be a non-empty string")
+        limit = min(max_length, COHERE_EMBED_MAX_CHARS)
+        payload = {
+            "texts": [text[:limit] for text in texts],
+            "input_type": "search_document",
+            "truncate": "END",
+        }
+        try:
+            body = self._invoke_model(model_id=model_id, payload=payload, op="embed_batch")
+            embeddings = body.get("embeddings")
+            if not embeddings or len(embeddings) != len(texts):
+                raise EmbeddingError(f"Expected {len(texts)} embeddings from {model_id}")
+            metas = []
+            for text in texts:
+                usage = {"tokens_in": self._tokens(text), "tokens_out": 0, "chars": len(text)}
+                metas.append({"model": model_id, "usage": usage, "cost": calculate_cost(model_id, usage)})
+            return embeddings, metas
+        except ProviderError:
+            raise
+        except Exception as e:
+            self._log(logging.ERROR, "Batch embedding failed", model=model_id, error=str(e))
+            raise EmbeddingError(f"Batch embedding failed (model={model_id}): {e}") from e
     # -------------------------------------------------------------------------
     # LLM Generation
     # -------------------------------------------------------------------------
@@ -326,10 +418,68 @@ class ModelLoader:
             return None
         return self._providers[self._current].get("model_name")
     # Delegated ops
-    def embed(self, *args, **kwargs):
+    def _embedding_model_id(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Model id used for cache keys: explicit model_id, else the provider's default"""
+        return kwargs.get("model_id") or getattr(self.current(), "embedding_model", None) or self.current_model()
+    def embed(self, text: str, **kwargs):
         model_name = self.current_model()
         self._logger.info(f"embed() called | model={model_name}")
-        return self.current().embed(*args, **kwargs)
+        model_id = self._embedding_model_id(kwargs)
+        if not model_id or not isinstance(text, str) or not text.strip():
+            return self.current().embed(text, **kwargs)
+        key = embedding_cache_key(model_id, text)
+        cached = local_embedding_cache.get(key)
+        if cached is not None:
+            return cached, _cached_embed_meta(model_id)
+        embedding, meta = self.current().embed(text, **kwargs)
+        local_embedding_cache.put(key, embedding)
+        return embedding, meta
+    def embed_batch(self, texts: List[str], **kwargs):
+        """
+        Batch embed through the current provider. Lookups go in-process LRU → DynamoDB
+        embedding cache (EMBEDDING_CACHE_TABLE) → provider; only misses reach the provider.
+        Results are returned in input order.
+        """
+        model_name = self.current_model()
+        self._logger.info(f"embed_batch() called | model={model_name}")
+        provider = self.current()
+        model_id = self._embedding_model_id(kwargs)
+        if not texts or not model_id:
+            return provider.embed_batch(texts, **kwargs)
+        keys = [embedding_cache_key(model_id, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        for key in set(keys):
+            embedding = local_embedding_cache.get(key)
+            if embedding is not None:
+                found[key] = embedding
+        cache = get_embedding_cache()
+        remote_keys = [key for key in set(keys) if key not in found]
+        if cache is not None and remote_keys:
+            try:
+                remote = cache.get_many_by_key(model_id, remote_keys)
+            except Exception as e:
+                self._logger.warning(f"Embedding cache lookup failed, embedding all misses: {e}")
+                remote = {}
+            for key, embedding in remote.items():
+                local_embedding_cache.put(key, embedding)
+            found.update(remote)
+        miss_positions = [pos for pos, key in enumerate(keys) if key not in found]
+        miss_texts = [texts[pos] for pos in miss_positions]
+        miss_embeddings, miss_metas = provider.embed_batch(miss_texts, **kwargs) if miss_texts else ([], [])
+        for pos, embedding in zip(miss_positions, miss_embeddings):
+            local_embedding_cache.put(keys[pos], embedding)
+        if cache is not None and miss_texts:
+            try:
+                cache.put_many(model_id, miss_texts, miss_embeddings)
+            except Exception as e:
+                self._logger.warning(f"Embedding cache write failed: {e}")
+        cached_meta = _cached_embed_meta(model_id)
+        embeddings: List[Optional[List[float]]] = [found.get(key) for key in keys]
+        metas: List[Dict[str, Any]] = [cached_meta] * len(texts)
+        for pos, embedding, meta in zip(miss_positions, miss_embeddings, miss_metas):
+            embeddings[pos] = embedding
+            metas[pos] = meta
+        return embeddings, metas
     def generate(self, *args, **kwargs):
         model_name = self.current_model()
         self._logger.info(f"generate() called | model={model_name}")
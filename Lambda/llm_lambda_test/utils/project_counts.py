@@ -0,0 +1,64 @@
+# =====================================================
+# Project Document Counter
+# =====================================================
+"""
+Atomic document_count on the projects table (PROJECTS_TABLE, key project_id):
+- ingestion ADDs the number of documents stored under a new key
+- document deletion ADDs -1 when the object existed
+get_project reads the counter instead of listing the project's S3 prefix.
+Rows created before the counter existed carry document_count=0 without the
+document_count_initialized marker; get_project backfills those from S3 once,
+and ADDs skip them until then.
+"""
+import os
+from utils.dynamodb import EnhancedDynamoDBClient
+from utils.logger import CustomLogger
+logger = CustomLogger(__name__)
+PROJECTS_TABLE = os.environ.get("PROJECTS_TABLE", "document-bot-projects")
+DOCUMENT_COUNT_MARKER = "document_count_initialized"
+_dynamo_client = None
+
+def _get_dynamo_client() -> EnhancedDynamoDBClient:
+    global _dynamo_client
+    if _dynamo_client is None:
+        _dynamo_client = EnhancedDynamoDBClient()
+    return _dynamo_client
+
+def project_id_for(project_name: str) -> str:
+    """Same sanitisation create_project uses for project_id"""
+    return project_name.replace(" ", "_").lower()
+
+def adjust_document_count(project_name: str, delta: int) -> bool:
+    """
+    ADD delta to document_count (best effort).
+    Only touches existing, initialised counters, and never takes one below zero.
+    """
+    if not project_name or not delta:
+        return False
+    condition = f"attribute_exists(project_id) AND {DOCUMENT_COUNT_MARKER} = :initialized"
+    values = {":delta": delta, ":initialized": True}
+    if delta < 0:
+        condition += " AND document_count >= :floor"
+        values[":floor"] = -delta
+    updated = _get_dynamo_client().update_item(
+        PROJECTS_TABLE,
+        {"project_id": project_id_for(project_name)},
+        "ADD document_count :delta",
+        expression_attribute_values=values,
+        condition_expression=condition,  # never create a bare counter row
+    )
+    if not updated:
+        logger.warning(f"⚠️ Could not adjust document_count for {project_name} by {delta}")
+    return updated
+
+def initialise_document_count(project_name: str, count: int) -> bool:
+    """Backfill document_count from an S3 count; only the first caller for a project wins"""
+    return _get_dynamo_client().update_item(
+        PROJECTS_TABLE,
+        {"project_id": project_id_for(project_name)},
+        f"SET document_count = :count, {DOCUMENT_COUNT_MARKER} = :initialized",
+        expression_attribute_values={":count": count, ":initialized": True},
+        condition_expression=f"attribute_exists(project_id) AND attribute_not_exists({DOCUMENT_COUNT_MARKER})",
+    )
+
+__all__ = ["adjust_document_count", "initialise_document_count", "project_id_for", "DOCUMENT_COUNT_MARKER"]
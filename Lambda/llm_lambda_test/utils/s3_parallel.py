@@ -0,0 +1,63 @@
+# =====================================================
+# Parallel S3 helpers
+# =====================================================
+"""
+Fan-out helpers for per-object S3 calls (HEAD, PUT) that are latency-bound.
+A single thread pool is created lazily and reused across warm invocations;
+pass the pooled client from connection_pool so workers share its connections.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from utils.logger import CustomLogger
+logger = CustomLogger(__name__)
+# Matches AWS_MAX_POOL_CONNECTIONS headroom on the shared S3 client
+S3_PARALLEL_WORKERS = int(os.getenv("S3_PARALLEL_WORKERS", "32"))
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=S3_PARALLEL_WORKERS, thread_name_prefix="s3_parallel")
+    return _executor
+
+def head_objects(s3_client, bucket: str, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    head_object for every key concurrently, in input order.
+    Keys that cannot be read (ClientError) come back as None so callers can skip them.
+    """
+    def _head(key):
+        try:
+            return s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            logger.warning(f"⚠️ head_object failed for {key}: {e}")
+            return None
+
+    if not keys:
+        return []
+    if len(keys) == 1:
+        return [_head(keys[0])]
+    return list(_get_executor().map(_head, keys))
+
+def put_objects(s3_client, bucket: str, objects: List[Tuple[str, Any, str]]) -> List[bool]:
+    """
+    put_object for every (key, body, content_type) concurrently, in input order.
+    Returns True per object that was written; failures are logged and come back as False.
+    """
+    def _put(item):
+        key, body, content_type = item
+        try:
+            s3_client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type)
+            return True
+        except ClientError as e:
+            logger.warning(f"⚠️ put_object failed for {key}: {e}")
+            return False
+
+    if not objects:
+        return []
+    if len(objects) == 1:
+        return [_put(objects[0])]
+    return list(_get_executor().map(_put, objects))
+
+__all__ = ["head_objects", "put_objects"]
@@ -1,5 +1,6 @@
 import io
 import logging
+import threading
 from typing import List, Optional
 
 # -------------------------------------------------------------------------
@@ -90,12 +91,136 @@ def detect_file_type(filename: str, file_bytes: Optional[bytes] = None) -> str:
 # -------------------------------------------------------------------------
 # Text extraction
 # -------------------------------------------------------------------------
+class _BufferReader(io.RawIOBase):
+    """
+    Seekable read-only stream over an in-memory buffer without copying it.
+    io.BytesIO copies a bytearray (the ingestion download buffer) in full before parsing;
+    use _open_buffer so parsers' small reads are served by a C BufferedReader.
+    """
+    def __init__(self, data):
+        self._view = memoryview(data)
+        self._pos = 0
+    def readable(self) -> bool:
+        return True
+    def seekable(self) -> bool:
+        return True
+    def tell(self) -> int:
+        return self._pos
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+def _open_buffer(data) -> io.BufferedIOBase:
+    """Zero-copy file-like for bytes/bytearray (bytes go through BytesIO, which shares them)"""
+    if isinstance(data, bytes):
+        return io.BytesIO(data)
+    return io.BufferedReader(_BufferReader(data))
+
+# Parser modules are imported on first use of their file type and kept here
+_pdfium = None
+_pdf_reader_cls = None
+_docx_module = None
+# PDFium is not thread-safe (not even across documents); every pypdfium2 call runs under this lock
+_PDFIUM_LOCK = threading.Lock()
+
+def _parse_pdf_pdfium(file_bytes) -> List[str]:
+    """Per-page text via PDFium (native), much faster than PyPDF2 on multi-page PDFs"""
+    global _pdfium
+    with _PDFIUM_LOCK:
+        if _pdfium is None:
+            import pypdfium2  # type: ignore
+            _pdfium = pypdfium2
+        pdf = _pdfium.PdfDocument(_open_buffer(file_bytes))
+        try:
+            pages = []
+            for page_num in range(len(pdf)):
+                page = None
+                try:
+                    page = pdf[page_num]
+                    textpage = page.get_textpage()
+                    try:
+                        pages.append(textpage.get_text_range())
+                    finally:
+                        textpage.close()
+                except Exception as e:
+                    logger.warning(f"Failed to extract text from PDF page {page_num}: {e}")
+                    pages.append("")
+                finally:
+                    if page is not None:
+                        page.close()
+            return pages
+        finally:
+            pdf.close()
+
+def _parse_pdf_pypdf2(file_bytes) -> List[str]:
+    global _pdf_reader_cls
+    if _pdf_reader_cls is None:
+        from PyPDF2 import PdfReader  # type: ignore
+        _pdf_reader_cls = PdfReader
+    reader = _pdf_reader_cls(_open_buffer(file_bytes))
+    pages = []
+    for page_num, page in enumerate(reader.pages):
+        try:
+            page_text = page.extract_text() or ""
+            pages.append(page_text)
+        except Exception as e:
+            logger.warning(f"Failed to extract text from PDF page {page_num}: {e}")
+            pages.append("")
+    return pages
+
+def _parse_pdf(file_bytes) -> str:
+    """pypdfium2 first; PyPDF2 when pypdfium2 is not installed or refuses the file"""
+    try:
+        pages = _parse_pdf_pdfium(file_bytes)
+        backend = "pypdfium2"
+    except ImportError:
+        pages = _parse_pdf_pypdf2(file_bytes)
+        backend = "PyPDF2"
+    except Exception as e:
+        logger.warning(f"pypdfium2 could not open PDF, falling back to PyPDF2: {e}")
+        pages = _parse_pdf_pypdf2(file_bytes)
+        backend = "PyPDF2"
+
+    text = "\n".join(pages).strip()
+    if text:
+        logger.info(f"PDF extraction successful ({backend}): {len(text)} chars from {len(pages)} pages")
+    return text
+
+def _parse_docx(file_bytes) -> str:
+    global _docx_module
+    if _docx_module is None:
+        import docx  # type: ignore
+        _docx_module = docx
+    document = _docx_module.Document(_open_buffer(file_bytes))
+    paragraphs = [para.text for para in document.paragraphs if para.text and para.text.strip()]
+    text = "\n".join(paragraphs).strip()
+    if text:
+        logger.info(f"DOCX extraction successful: {len(text)} chars from {len(paragraphs)} paragraphs")
+    return text
+
+# file type → (parser, library named when it is missing); every other type is UTF-8 decoded
+_PARSERS = {
+    "pdf": (_parse_pdf, "pypdfium2/PyPDF2"),
+    "docx": (_parse_docx, "python-docx"),
+}
+BINARY_FILE_TYPES = frozenset(_PARSERS)
+
 def extract_text(file_bytes: bytes, filename: str) -> str:
     """
-    Extract text based on detected file type; fallback to UTF-8 decode.
+    Extract text based on detected file type; UTF-8 decode for txt/unknown only.
+    Binary formats (pdf/docx) that fail to parse return "" instead of decoded garbage.
     Returns empty string on failure (consistent with data_ingestion.py expectations).
     """
-    if not isinstance(file_bytes, bytes) or not file_bytes:
+    if not isinstance(file_bytes, (bytes, bytearray)) or not file_bytes:
         logger.warning("Invalid or empty file_bytes provided")
         return ""
 
@@ -107,45 +232,22 @@ def extract_text(file_bytes: bytes, filename: str) -> str:
     logger.info(f"Extracting text from {filename} (detected type: {ftype})")
 
     try:
-        if ftype == "pdf":
+        parser = _PARSERS.get(ftype)
+        if parser is not None:
+            parse, library = parser
             try:
-                from PyPDF2 import PdfReader  # type: ignore
-                reader = PdfReader(io.BytesIO(file_bytes))
-                pages = []
-                for page_num, page in enumerate(reader.pages):
-                    try:
-                        page_text = page.extract_text() or ""
-                        pages.append(page_text)
-                    except Exception as e:
-                        logger.warning(f"Failed to extract text from PDF page {page_num}: {e}")
-                        pages.append("")
-
-                text = "\n".join(pages).strip()
+                text = parse(file_bytes)
                 if text:
-                    logger.info(f"PDF extraction successful: {len(text)} chars from {len(pages)} pages")
                     return text
-                else:
-                    logger.warning("PDF extraction yielded no text")
+                logger.warning(f"{ftype.upper()} extraction yielded no text")
             except ImportError:
-                logger.error("PyPDF2 not available for PDF processing")
+                logger.error(f"{library} not available for {ftype.upper()} processing")
             except Exception as e:
-                logger.warning(f"PDF parse failed, trying fallback decode: {e}")
+                logger.warning(f"{ftype.upper()} parse failed: {e}")
 
-        elif ftype == "docx":
-            try:
-                import docx  # type: ignore
-                document = docx.Document(io.BytesIO(file_bytes))
-                paragraphs = [para.text for para in document.paragraphs if para.text and para.text.strip()]
-                text = "\n".join(paragraphs).strip()
-                if text:
-                    logger.info(f"DOCX extraction successful: {len(text)} chars from {len(paragraphs)} paragraphs")
-                    return text
-                else:
-                    logger.warning("DOCX extraction yielded no text")
-            except ImportError:
-                logger.error("python-docx not available for DOCX processing")
-            except Exception as e:
-                logger.warning(f"DOCX parse failed, trying fallback decode: {e}")
+            # Decoding PDF/DOCX bytes yields binary noise that would still be chunked and embedded
+            logger.warning(f"No text layer in {filename} ({ftype}); skipping raw decode")
+            return ""
 
         # Fallback: attempt UTF-8 decode
         try:
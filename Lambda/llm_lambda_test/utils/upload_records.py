@@ -0,0 +1,68 @@
+# =====================================================
+# Upload Records Table
+# =====================================================
+"""
+One row per issued upload, kept in DynamoDB (needs UPLOADS_TABLE):
+- upload handler writes {upload_id, s3_key, size, content_type, metadata} when it signs the POST
+- upload status reads an upload's keys with a single Query on upload_id instead of
+  listing the project prefix, then HEADs only those keys (a row does not prove the file arrived)
+Rows are written once and never rewritten, unlike ingestion-status rows.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from utils.dynamodb import EnhancedDynamoDBClient
+from utils.logger import CustomLogger
+logger = CustomLogger(__name__)
+UPLOADS_TABLE = os.getenv("UPLOADS_TABLE")
+
+class UploadRecordStore:
+    """Rows keyed by (upload_id, s3_key)."""
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.dynamo_client = EnhancedDynamoDBClient()
+
+    def record(
+        self,
+        upload_id: str,
+        project_name: str,
+        s3_key: str,
+        content_type: str,
+        metadata: Dict[str, str],
+        size: int = None,
+    ) -> bool:
+        """Record an issued upload (best effort)"""
+        item = {
+            "upload_id": upload_id,
+            "s3_key": s3_key,
+            "project_name": project_name,
+            "filename": s3_key.rsplit("/", 1)[-1],
+            "content_type": content_type,
+            "metadata": metadata,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        if size is not None:
+            item["size"] = size
+        return self.dynamo_client.put_item(self.table_name, item)
+
+    def by_upload_id(self, upload_id: str) -> List[Dict[str, Any]]:
+        """Every file recorded for upload_id ([] when none, or on error)"""
+        return self.dynamo_client.query_items(
+            self.table_name,
+            key_condition_expression="upload_id = :upload_id",
+            expression_attribute_values={":upload_id": upload_id},
+        )
+
+_upload_record_store: Optional[UploadRecordStore] = None
+
+def get_upload_record_store() -> Optional[UploadRecordStore]:
+    """Shared store instance, or None when UPLOADS_TABLE is unset"""
+    global _upload_record_store
+    if _upload_record_store is None and UPLOADS_TABLE:
+        _upload_record_store = UploadRecordStore(UPLOADS_TABLE)
+    return _upload_record_store
+
+__all__ = [
+    "UploadRecordStore",
+    "get_upload_record_store",
+]
@@ -6,7 +6,10 @@ import logging
 import sys
 import traceback
 import inspect
+import os
 from typing import Optional
+# Root level for every CustomLogger (e.g. INFO in production to drop debug output)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
 # -----------------------------
 # Custom Logger
 # -----------------------------
@@ -22,7 +25,7 @@ class CustomLogger:
             )
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
-        self.logger.setLevel(logging.DEBUG)
+        self.logger.setLevel(LOG_LEVEL)
     def _inject_classname(self, msg: str) -> str:
         """
         Detect class name and enhanced module info if log call was made inside a class method.
@@ -55,12 +58,17 @@ class CustomLogger:
             
         prefix = f"[{' | '.join(parts)}]" if parts else "[Unknown]"
         return f"{prefix} {msg}"
+    # Level check first: skips the frame inspection in _inject_classname for disabled levels.
+    # Pass %-style args (logger.info("x=%s", x)) so message formatting is lazy as well.
     def debug(self, msg, *args, **kwargs):
-        self.logger.debug(self._inject_classname(msg), *args, **kwargs)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self._inject_classname(msg), *args, **kwargs)
     def info(self, msg, *args, **kwargs):
-        self.logger.info(self._inject_classname(msg), *args, **kwargs)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self._inject_classname(msg), *args, **kwargs)
     def warning(self, msg, *args, **kwargs):
-        self.logger.warning(self._inject_classname(msg), *args, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(self._inject_classname(msg), *args, **kwargs)
     def error(self, msg, *args, exc_info=False, **kwargs):
         # Auto-detect import errors and enhance the message
         if exc_info or (args and isinstance(args[0], ImportError)):
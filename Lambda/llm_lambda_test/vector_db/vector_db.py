@@ -1,15 +1,21 @@
 
 import os
 import uuid
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Tuple, Union
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
     VectorParams,
     PointStruct,
+    Batch,
     Filter,
     FieldCondition,
     MatchValue,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
 )
 from utils.utils import CustomLogger
 from utils.connection_pool import connection_pool
@@ -32,6 +38,13 @@ class QdrantConfig:
     API_KEY: str = os.getenv("VECTOR_DB_API_KEY", "")
     COLLECTION: str = os.getenv("COLLECTION_NAME", "Demo")
     VECTOR_DIM: int = int(os.getenv("VECTOR_DIMENSION", "1536"))
+    # int8 scalar quantization (≈4x smaller in-RAM vectors, faster HNSW scoring); "none" disables
+    QUANTIZATION: str = os.getenv("VECTOR_DB_QUANTIZATION", "int8").lower()
+    # Ingest upserts: points per request, and whether to block until Qdrant has applied them
+    UPSERT_BATCH_SIZE: int = int(os.getenv("VECTOR_DB_UPSERT_BATCH_SIZE", "256"))
+    UPSERT_WAIT: bool = os.getenv("VECTOR_DB_UPSERT_WAIT", "false").lower() == "true"
+    # Decimal places kept when vectors go over REST/JSON (float32 → double repr is ~19 chars); -1 sends full precision
+    WIRE_DECIMALS: int = int(os.getenv("VECTOR_DB_WIRE_DECIMALS", "6"))
 
 # ======================================================
 # Qdrant Vector DB Wrapper
@@ -53,6 +66,15 @@ class QdrantVectorDB:
         # Cache collection info to avoid repeated API calls
         self._collection_exists = None
         self._collection_dim = None
+        # Concurrent ingestion threads share this instance; only one may create/recreate the collection
+        self._collection_lock = threading.Lock()
+    def _quantization_config(self):
+        """Collection-level quantization applied when a collection is (re)created"""
+        if self.config.QUANTIZATION != "int8":
+            return None
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
     # --------------------------------------------------
     # Ensure collection
     # --------------------------------------------------
@@ -61,6 +83,12 @@ class QdrantVectorDB:
         Ensure Qdrant collection exists and has the correct vector dimension.
         Uses caching to avoid repeated API calls during Lambda execution.
         """
+        if self._collection_exists and self._collection_dim == required_dim:
+            return True
+        with self._collection_lock:
+            return self._ensure_collection_uncached(required_dim)
+    def _ensure_collection_uncached(self, required_dim: int) -> bool:
+        """Collection check/create body; caller holds _collection_lock."""
         # Use cached result if available and dimension matches
         if (self._collection_exists is not None and 
             self._collection_dim is not None and 
@@ -77,6 +105,7 @@ class QdrantVectorDB:
                 self.client.create_collection(
                     collection_name=self.config.COLLECTION,
                     vectors_config=VectorParams(size=required_dim, distance=Distance.COSINE),
+                    quantization_config=self._quantization_config(),
                 )
                 logger.info(
                     f"✅ Created collection {self.config.COLLECTION} with dim={required_dim}"
@@ -107,6 +136,7 @@ class QdrantVectorDB:
                         self.client.create_collection(
                             collection_name=self.config.COLLECTION,
                             vectors_config=VectorParams(size=required_dim, distance=Distance.COSINE),
+                            quantization_config=self._quantization_config(),
                         )
                         logger.info(
                             f"✅ Recreated collection {self.config.COLLECTION} with dim={required_dim}"
@@ -158,17 +188,9 @@ class QdrantVectorDB:
                     logger.warning(f"Skipping item without metadata: {item}")
                     continue
                 point_id = item.get("id", str(uuid.uuid4()))
-                vector_payload = {
-                    "project_name": metadata_dict.get("project_name"),
-                    "user_id": metadata_dict.get("user_id"),
-                    "session_id": metadata_dict.get("session_id"),
-                    "document_id": metadata_dict.get("document_id"),
-                    "chunk_id": metadata_dict.get("chunk_id"),
-                    "filename": metadata_dict.get("filename"),
-                    "file_type": metadata_dict.get("file_type"),
-                    "embedding_model": metadata_dict.get("embedding_model"),
-                    "tags": metadata_dict.get("tags"),
-                }
+                vector_payload = self.build_payload(metadata_dict)
+                vector_payload["chunk_id"] = metadata_dict.get("chunk_id")
+                vector_payload["duplicate_count"] = metadata_dict.get("duplicate_count", 1)
                 if STORE_TEXT_IN_VECTOR_DB and item.get("text"):
                     vector_payload["text"] = item["text"]
                 points.append(
@@ -181,13 +203,90 @@ class QdrantVectorDB:
             if not points:
                 logger.error("No valid embeddings to upsert.")
                 return False
-            self.client.upsert(collection_name=self.config.COLLECTION, points=points)
+            size = self.config.UPSERT_BATCH_SIZE
+            for start in range(0, len(points), size):
+                self.client.upsert(
+                    collection_name=self.config.COLLECTION,
+                    points=points[start:start + size],
+                    wait=self.config.UPSERT_WAIT,
+                )
             logger.info(f"✅ Upserted {len(points)} embeddings into Qdrant.")
             return True
         except Exception as e:
             logger.error(f"❌ Error upserting embeddings: {e}", exc_info=True)
             return False
     # --------------------------------------------------
+    # Upsert (column-oriented)
+    # --------------------------------------------------
+    @staticmethod
+    def build_payload(metadata_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Project document metadata onto the per-point payload fields stored in Qdrant"""
+        return {
+            "project_name": metadata_dict.get("project_name"),
+            "user_id": metadata_dict.get("user_id"),
+            "session_id": metadata_dict.get("session_id"),
+            "document_id": metadata_dict.get("document_id"),
+            "filename": metadata_dict.get("filename"),
+            "file_type": metadata_dict.get("file_type"),
+            "embedding_model": metadata_dict.get("embedding_model"),
+            "tags": metadata_dict.get("tags"),
+        }
+    def _wire_vectors(self, vectors: np.ndarray) -> List[List[float]]:
+        """
+        Matrix → nested lists for the request body, rounded to WIRE_DECIMALS.
+        1e-6 on unit-norm components is far below the int8 collection quantization error,
+        and roughly halves the JSON size of each vector.
+        """
+        if self.config.WIRE_DECIMALS < 0:
+            return vectors.tolist()
+        return np.round(vectors.astype(np.float64), self.config.WIRE_DECIMALS).tolist()
+    def upsert_embeddings_soa(
+        self,
+        ids: List[str],
+        vectors: Union[np.ndarray, List[List[float]]],
+        payloads: List[Dict[str, Any]],
+        texts: List[str] = None,
+    ) -> bool:
+        """
+        Store embeddings given as parallel lists (ids, vectors, payloads, texts).
+        vectors may be an (N, D) float32 ndarray or a list of lists.
+        Sent as one qdrant Batch, skipping per-point PointStruct construction.
+        """
+        if len(vectors) == 0:
+            logger.warning("No embeddings provided to upsert.")
+            return False
+        try:
+            required_dim = vectors.shape[1] if isinstance(vectors, np.ndarray) else len(vectors[0])
+            logger.debug(f"Detected embedding dimension={required_dim}")
+            if not self.ensure_collection(required_dim):
+                logger.error("Aborting upsert due to collection dimension mismatch.")
+                return False
+            if STORE_TEXT_IN_VECTOR_DB and texts:
+                for payload, text in zip(payloads, texts):
+                    if text:
+                        payload["text"] = text
+            # Sub-batches keep each request under gRPC/HTTP message limits; wait=False returns once
+            # Qdrant has accepted the points instead of after they are indexed
+            size = self.config.UPSERT_BATCH_SIZE
+            for start in range(0, len(ids), size):
+                end = start + size
+                batch_vectors = vectors[start:end]
+                self.client.upsert(
+                    collection_name=self.config.COLLECTION,
+                    # Batch validates plain lists; convert the matrix only at the send boundary
+                    points=Batch(
+                        ids=ids[start:end],
+                        vectors=self._wire_vectors(batch_vectors) if isinstance(batch_vectors, np.ndarray) else batch_vectors,
+                        payloads=payloads[start:end],
+                    ),
+                    wait=self.config.UPSERT_WAIT,
+                )
+            logger.info(f"✅ Upserted {len(ids)} embeddings into Qdrant.")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error upserting embeddings: {e}", exc_info=True)
+            return False
+    # --------------------------------------------------
     # Search
     # --------------------------------------------------
     def search(self, query_vector: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
@@ -216,6 +315,75 @@ class QdrantVectorDB:
             logger.error(f"❌ Error searching Qdrant: {e}", exc_info=True)
             return []
     # --------------------------------------------------
+    # Filtered / paginated search (limit, offset and filters run server-side)
+    # --------------------------------------------------
+    # Payload keys callers may filter on with exact matches
+    FILTERABLE_FIELDS = ("project_name", "user_id", "session_id", "document_id", "filename", "file_type", "embedding_model")
+    @classmethod
+    def build_filter(cls, project_name: str = None, filters: Dict[str, Any] = None) -> Union[Filter, None]:
+        """Exact-match Filter on project_name plus any FILTERABLE_FIELDS present in filters"""
+        conditions = []
+        if project_name:
+            conditions.append(FieldCondition(key="project_name", match=MatchValue(value=project_name)))
+        for key, value in (filters or {}).items():
+            if key in cls.FILTERABLE_FIELDS and key != "project_name" and value not in (None, ""):
+                conditions.append(FieldCondition(key=key, match=MatchValue(value=value)))
+        return Filter(must=conditions) if conditions else None
+    def search_page(
+        self,
+        query_vector: List[float],
+        limit: int = 20,
+        offset: int = 0,
+        query_filter: Filter = None,
+    ) -> List[Dict[str, Any]]:
+        """One page of nearest neighbours; Qdrant applies the filter, offset and limit."""
+        try:
+            results = self.client.search(
+                collection_name=self.config.COLLECTION,
+                query_vector=query_vector,
+                query_filter=query_filter,
+                limit=limit,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            return [{"id": str(r.id), "score": float(r.score), "metadata": r.payload} for r in results]
+        except Exception as e:
+            logger.error(f"❌ Error searching Qdrant page: {e}", exc_info=True)
+            return []
+    def scroll_page(
+        self, limit: int = 20, cursor: Any = None, scroll_filter: Filter = None
+    ) -> Tuple[List[Dict[str, Any]], Any]:
+        """
+        One page of filtered points without a query vector, plus the cursor for the next
+        page (None on the last page). Scroll pages by point id, so callers pass back the
+        returned cursor instead of a numeric offset.
+        """
+        try:
+            points, next_cursor = self.client.scroll(
+                collection_name=self.config.COLLECTION,
+                scroll_filter=scroll_filter,
+                limit=limit,
+                offset=cursor,
+                with_payload=True,
+                with_vectors=False,
+            )
+            return [{"id": str(p.id), "score": None, "metadata": p.payload} for p in points], next_cursor
+        except Exception as e:
+            logger.error(f"❌ Error scrolling Qdrant: {e}", exc_info=True)
+            return [], None
+    def count(self, count_filter: Filter = None, exact: bool = False) -> int:
+        """Number of points matching count_filter (approximate unless exact=True)."""
+        try:
+            return self.client.count(
+                collection_name=self.config.COLLECTION,
+                count_filter=count_filter,
+                exact=exact,
+            ).count
+        except Exception as e:
+            logger.error(f"❌ Error counting Qdrant points: {e}", exc_info=True)
+            return 0
+    # --------------------------------------------------
     # Delete by ID
     # --------------------------------------------------
     def delete_by_id(self, point_id: str) -> bool:
@@ -54,14 +54,120 @@ resource "aws_dynamodb_table" "metadata" {
     name = "content_hash"
     type = "S"
   }
+  # Attribute for etag (S3 MD5 of single-part uploads, used in GSI)
+  attribute {
+    name = "etag"
+    type = "S"
+  }
   # Global Secondary Index for content_hash lookups
   global_secondary_index {
     name            = "content_hash-index"
     hash_key        = "content_hash"
     projection_type = "ALL"
   }
+  # Sparse GSI for pre-download duplicate checks by S3 ETag
+  global_secondary_index {
+    name            = "etag-index"
+    hash_key        = "etag"
+    projection_type = "ALL"
+  }
   tags = var.common_tags
 }
+# ============================================================================
+#  EMBEDDING CACHE DYNAMODB TABLE
+# ============================================================================
+resource "aws_dynamodb_table" "embedding_cache" {
+  name         = "embedding-cache"
+  billing_mode = "PAY_PER_REQUEST"
+  # cache_key = "<embedding model>:<sha256 of chunk text>"
+  hash_key     = "cache_key"
+  attribute {
+    name = "cache_key"
+    type = "S"
+  }
+  tags = var.common_tags
+}
+# ============================================================================
+#  INGESTION STATUS DYNAMODB TABLE
+# ============================================================================
+resource "aws_dynamodb_table" "ingestion_status" {
+  name         = "ingestion-status"
+  billing_mode = "PAY_PER_REQUEST"
+  # One row per uploaded temp file
+  hash_key     = "project_name"
+  range_key    = "s3_key"
+  attribute {
+    name = "project_name"
+    type = "S"
+  }
+  attribute {
+    name = "s3_key"
+    type = "S"
+  }
+  attribute {
+    name = "status"
+    type = "S"
+  }
+  # COUNT of processing files per project without listing S3
+  global_secondary_index {
+    name            = "project_name-status-index"
+    hash_key        = "project_name"
+    range_key       = "status"
+    projection_type = "ALL"
+  }
+  tags = var.common_tags
+}
+# ============================================================================
+#  UPLOADS DYNAMODB TABLE
+# ============================================================================
+resource "aws_dynamodb_table" "uploads" {
+  name         = "uploads"
+  billing_mode = "PAY_PER_REQUEST"
+  # One row per issued upload (UPLOADS_TABLE); upload status queries by upload_id
+  hash_key     = "upload_id"
+  range_key    = "s3_key"
+  attribute {
+    name = "upload_id"
+    type = "S"
+  }
+  attribute {
+    name = "s3_key"
+    type = "S"
+  }
+  tags = var.common_tags
+}
+# ============================================================================
+#  PROJECTS DYNAMODB TABLE (PROJECTS_TABLE, default "document-bot-projects")
+# ============================================================================
+# The projects table is provisioned outside this stack. list_projects queries the
+# status-created_at-index GSI below (PROJECTS_STATUS_INDEX) and falls back to a
+# status-filtered Scan while it is missing. To manage the table here, import it first
+# (terraform import aws_dynamodb_table.projects document-bot-projects), then uncomment:
+# resource "aws_dynamodb_table" "projects" {
+#   name         = "document-bot-projects"
+#   billing_mode = "PAY_PER_REQUEST"
+#   hash_key     = "project_id"
+#   attribute {
+#     name = "project_id"
+#     type = "S"
+#   }
+#   attribute {
+#     name = "status"
+#     type = "S"
+#   }
+#   attribute {
+#     name = "created_at"
+#     type = "S"
+#   }
+#   # Active projects newest first without a Scan
+#   global_secondary_index {
+#     name            = "status-created_at-index"
+#     hash_key        = "status"
+#     range_key       = "created_at"
+#     projection_type = "ALL"
+#   }
+#   tags = var.common_tags
+# }
 # # -----------------------------
 # # IAM Policy for DynamoDB access
 # # -----------------------------
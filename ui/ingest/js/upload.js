@@ -1,6 +1,6 @@
 /**
  * Upload Management Module
- * Handles direct S3 uploads via Lambda (Base64 encoded)
+ * Gets a presigned POST from Lambda, then uploads each file directly to S3
  */
 class UploadManager {
     constructor(sessionManager, modelManager, uiManager) {
@@ -100,7 +100,7 @@ class UploadManager {
             throw new Error(`File "${file.name}" is too large (${(file.size / (1024 * 1024)).toFixed(1)}MB). Max 30MB allowed.`);
         }
 
-        const fileBase64 = await this.readFileAsBase64(file);
+        const sha256 = await this.computeSha256(file);
 
         const embeddingPayload = this.modelManager?.getSelectedEmbeddingModelPayload?.() || {};
         const embedding_provider = embeddingPayload.embedding_provider || "bedrock";
@@ -110,14 +110,15 @@ class UploadManager {
             project_name: projectName,
             file_name: file.name,
             content_type: file.type || this.getContentTypeFromExtension(file.name),
-            file_content: fileBase64,
+            file_size: file.size,
+            sha256,
             session_id: sessionId,
             user_id: this.sessionManager?.currentSession?.user?.username || "unknown",
             embedding_provider,
             embedding_model
         };
 
-        console.log("📤 Uploading via Lambda:", payload);
+        console.log("📤 Requesting presigned upload:", payload);
 
         // ✅ Use updated makeApiRequest from api-config.js
         const response = await window.makeApiRequest(
@@ -133,17 +134,29 @@ class UploadManager {
             throw new Error(responseBody.error || "Upload failed at Lambda");
         }
 
+        // ✅ Browser → S3 directly (fields first, file last, as S3 POST requires)
+        const { upload, ...ingestBody } = responseBody;
+        const formData = new FormData();
+        Object.entries(upload.fields).forEach(([key, value]) => formData.append(key, value));
+        formData.append("file", file);
+
+        const s3Response = await fetch(upload.url, { method: "POST", body: formData });
+        if (!s3Response.ok) {
+            throw new Error(`S3 upload failed for "${file.name}": HTTP ${s3Response.status}`);
+        }
+
         console.log(`✅ Uploaded to S3: ${file.name}`);
-        return response;
+        // Keep only the ingestion-shaped body (the presigned policy is single-use and short-lived)
+        return { ...response, body: JSON.stringify(ingestBody) };
     }
 
-    readFileAsBase64(file) {
-        return new Promise((resolve, reject) => {
-            const reader = new FileReader();
-            reader.onload = () => resolve(reader.result.split(",")[1]);
-            reader.onerror = reject;
-            reader.readAsDataURL(file);
-        });
+    async computeSha256(file) {
+        // Hex digest stored as x-amz-meta-sha256; ingestion verifies it against the downloaded bytes
+        if (!window.crypto?.subtle) return undefined;
+        const digest = await window.crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+        return Array.from(new Uint8Array(digest))
+            .map(b => b.toString(16).padStart(2, "0"))
+            .join("");
     }
 
     getContentTypeFromExtension(fileName) {